@@ -221,6 +221,11 @@ if [ ! -f "$USER_HOME/.env" ]; then
 # PISTAT_RATE_LIMIT_ENABLED=True   # Enable request rate limiting
 # PISTAT_RATE_LIMIT_REQUESTS=60    # Maximum requests per time window
 # PISTAT_RATE_LIMIT_WINDOW=60      # Rate limit time window in seconds
+# PISTAT_THREADS=4                 # Worker threads for the waitress server
+# PISTAT_NETCONN_TTL=5             # Seconds the active connection count is reused
+# PISTAT_HISTORY_SIZE=1800         # Samples kept for /metrics/history
+# PISTAT_PROCESS_CACHE_SECONDS=1   # How long /processes reuses a process snapshot
+# PISTAT_PROCESS_SAMPLE_SECONDS=0  # Background process sampling interval (0 = off)
 EOF
     echo "Created .env file at $USER_HOME/.env"
 fi
@@ -1,19 +1,31 @@
-from flask import Flask, jsonify, render_template_string, request, make_response
+from flask import Flask, request, make_response
+from flask.json.provider import JSONProvider
+import orjson
 import psutil
 import time
 import subprocess
 import os
-import re
 import json
 import logging
 import platform
 import sys
-from functools import lru_cache
+from functools import lru_cache, wraps
+from operator import itemgetter
+from contextlib import nullcontext
 from dotenv import load_dotenv
-from collections import defaultdict, deque
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import gzip
-from typing import Dict, List, Union, Tuple, Optional, Any, Callable
+import hashlib
+import heapq
+import math
+from array import array
+import select
+try:
+    import pwd
+except ImportError:
+    pwd = None  # Not available on Windows
+from typing import Dict, List, Set, FrozenSet, Union, Tuple, Optional, Any, Callable
 from datetime import datetime
 
 # Load environment variables from .env file if it exists
@@ -39,7 +51,12 @@ if PLATFORM_SYSTEM == "Linux":
         # Not a Raspberry Pi or file doesn't exist
         pass
 
-logger.info(f"Platform detected: {PLATFORM_SYSTEM}, Is Raspberry Pi: {IS_RASPBERRY_PI}")
+logger.info("Platform detected: %s, Is Raspberry Pi: %s", PLATFORM_SYSTEM, IS_RASPBERRY_PI)
+
+# Boot time, hostname and interpreter version are constant for the lifetime of the process
+BOOT_TIME = psutil.boot_time()
+HOSTNAME = platform.node()
+PYTHON_VERSION = platform.python_version()
 
 # Improved configuration management with validation
 def get_env_int(name: str, default: int, min_val: int = None, max_val: int = None) -> int:
@@ -47,14 +64,14 @@ def get_env_int(name: str, default: int, min_val: int = None, max_val: int = Non
     try:
         value = int(os.environ.get(name, default))
         if min_val is not None and value < min_val:
-            logger.warning(f"{name} value {value} below minimum {min_val}, using minimum")
+            logger.warning("%s value %s below minimum %s, using minimum", name, value, min_val)
             return min_val
         if max_val is not None and value > max_val:
-            logger.warning(f"{name} value {value} above maximum {max_val}, using maximum")
+            logger.warning("%s value %s above maximum %s, using maximum", name, value, max_val)
             return max_val
         return value
     except ValueError:
-        logger.warning(f"Invalid {name} value, using default: {default}")
+        logger.warning("Invalid %s value, using default: %s", name, default)
         return default
 
 def get_env_bool(name: str, default: bool) -> bool:
@@ -76,45 +93,189 @@ RATE_LIMIT_WINDOW = get_env_int('PISTAT_RATE_LIMIT_WINDOW', 60, 1, 3600)
 ENABLE_COMPRESSION = get_env_bool('PISTAT_COMPRESSION', True)
 # Response size limit (in bytes)
 MIN_SIZE_TO_COMPRESS = get_env_int('PISTAT_MIN_COMPRESS_SIZE', 500, 0, 10000)
+# Worker threads for the production WSGI server
+SERVER_THREADS = get_env_int('PISTAT_THREADS', 4, 1, 64)
+# Seconds an active connection count is reused; the /proc/net tables grow with every open socket
+CONNECTIONS_TTL = get_env_int('PISTAT_NETCONN_TTL', 5, 1, 300)
+# Number of samples kept for /metrics/history (one per PISTAT_CACHE_SECONDS)
+HISTORY_SIZE = get_env_int('PISTAT_HISTORY_SIZE', 1800, 1, 86400)
+# How long a process table snapshot is reused by /processes
+PROCESS_CACHE_SECONDS = get_env_int('PISTAT_PROCESS_CACHE_SECONDS', 1, 0, 60)
+# Interval for re-ranking processes in the background (0 = only on request)
+PROCESS_SAMPLE_SECONDS = get_env_int('PISTAT_PROCESS_SAMPLE_SECONDS', 0, 0, 3600)
 
 # Update log level from configuration
 if hasattr(logging, LOG_LEVEL):
     logger.setLevel(getattr(logging, LOG_LEVEL))
 else:
-    logger.warning(f"Invalid log level: {LOG_LEVEL}, using INFO")
+    logger.warning("Invalid log level: %s, using INFO", LOG_LEVEL)
     logger.setLevel(logging.INFO)
 
+# orjson-backed JSON provider - serializes straight to bytes, much faster than stdlib json
+class OrjsonProvider(JSONProvider):
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON string"""
+        return orjson.dumps(obj, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialize data from a JSON string or bytes"""
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Build a JSON response without the intermediate str round-trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.OPTIONS), mimetype='application/json')
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+# Every endpoint is a plain GET: accept a trailing slash instead of 404ing it,
+# and skip synthesizing OPTIONS handlers that nothing uses (the API has no CORS)
+app.url_map.strict_slashes = False
+
+def json_response(data: Any, status: int = 200):
+    """Serialize data with orjson and wrap it in a response, skipping the jsonify indirection"""
+    return app.response_class(orjson.dumps(data, option=OrjsonProvider.OPTIONS),
+                              status=status, mimetype='application/json')
 
-# Improved rate limiting implementation using sliding window with deque
+def ttl_cache(seconds: int, maxsize: int = 1):
+    """
+    Memoize a function per wall-clock bucket of the given length, so a result
+    is reused for at most that many seconds.
+    
+    Args:
+        seconds: Bucket length in seconds
+        maxsize: Number of distinct argument combinations to keep
+    """
+    def decorator(func):
+        @lru_cache(maxsize=maxsize)
+        def cached(bucket, *args, **kwargs):
+            return func(*args, **kwargs)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return cached(int(time.time() // seconds), *args, **kwargs)
+        return wrapper
+    return decorator
+
+def json_errors(message: str):
+    """
+    Turn an unhandled exception in an endpoint into a logged JSON 500 response.
+    
+    Args:
+        message: Error summary returned to the client and used in the log line
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error("%s: %s", message, e)
+                return json_response({
+                    'error': message,
+                    'details': str(e),
+                    'timestamp': time.time()
+                }, 500)
+        return wrapper
+    return decorator
+
+# Rate limiting using a sliding window counter approximation - O(1) memory and work per client
 class RateLimiter:
+    # Number of lock shards; clients are spread across them so unrelated IPs don't contend
+    LOCK_SHARDS = 64
+    
     def __init__(self, window_size: int, max_requests: int):
         self.window_size = window_size
         self.max_requests = max_requests
-        self.clients: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_requests))
-        self.lock = threading.Lock()
+        # client_id -> [window index, previous window count, current window count]
+        self.clients: Dict[str, List[int]] = {}
+        self.locks = [threading.Lock() for _ in range(self.LOCK_SHARDS)]
+        # Idle clients are dropped at most once per window so the dict can't grow without bound
+        self.sweep_lock = threading.Lock()
+        self.next_sweep = time.monotonic() + window_size
+    
+    def _lock_for(self, client_id: str) -> threading.Lock:
+        """Get the lock guarding a client's counters"""
+        return self.locks[hash(client_id) % self.LOCK_SHARDS]
+    
+    def _sweep(self, window_index: int):
+        """Drop clients whose counters no longer contribute to the sliding window"""
+        for client_id, counter in list(self.clients.items()):
+            if window_index - counter[0] > 1:
+                with self._lock_for(client_id):
+                    # Re-check under the shard lock in case the client came back meanwhile
+                    if window_index - counter[0] > 1 and self.clients.get(client_id) is counter:
+                        del self.clients[client_id]
     
     def is_rate_limited(self, client_id: str) -> bool:
-        """Check if the client has exceeded the rate limit using sliding window"""
+        """
+        Check if the client has exceeded the rate limit.
+        
+        The request rate over the sliding window is estimated from the current
+        fixed window's count plus the previous window's count weighted by how
+        much of it still overlaps the sliding window.
+        """
         if not RATE_LIMIT_ENABLED:
             return False
+        
+        now = time.monotonic()
+        if now >= self.next_sweep and self.sweep_lock.acquire(blocking=False):
+            try:
+                self.next_sweep = now + self.window_size
+                self._sweep(int(now // self.window_size))
+            finally:
+                self.sweep_lock.release()
             
-        with self.lock:
-            now = time.time()
-            client_history = self.clients[client_id]
+        # A client always maps to the same shard, so its counters are only touched under one lock
+        with self._lock_for(client_id):
+            now = time.monotonic()
+            window_index = int(now // self.window_size)
+            counter = self.clients.get(client_id)
             
-            # Remove requests older than the window
-            while client_history and now - client_history[0] > self.window_size:
-                client_history.popleft()
+            if counter is None:
+                counter = [window_index, 0, 0]
+                self.clients[client_id] = counter
+            elif counter[0] != window_index:
+                # Roll over: the current count becomes the previous one if the windows are adjacent
+                counter[1] = counter[2] if window_index - counter[0] == 1 else 0
+                counter[2] = 0
+                counter[0] = window_index
             
             # Check if rate limit is exceeded
-            if len(client_history) >= self.max_requests:
+            elapsed = now - window_index * self.window_size
+            weighted = counter[2] + counter[1] * (1 - elapsed / self.window_size)
+            if weighted >= self.max_requests:
                 return True
                 
             # Record this request
-            client_history.append(now)
+            counter[2] += 1
             return False
+    
+    def retry_after(self, client_id: str) -> int:
+        """
+        Seconds until the client's sliding window estimate drops back under the limit.
+        
+        Returns:
+            int: Whole seconds to wait, at least 1
+        """
+        with self._lock_for(client_id):
+            counter = self.clients.get(client_id)
+            now = time.monotonic()
+            if counter is None or counter[0] != int(now // self.window_size):
+                return 1
+            
+            _, previous, current = counter
+            elapsed = now - counter[0] * self.window_size
+            if current < self.max_requests and previous:
+                # Wait for the previous window's weight to decay within this window
+                wait = self.window_size * (1 - (self.max_requests - current) / previous) - elapsed
+            else:
+                # Wait into the next window, until this window's count has decayed enough
+                wait = self.window_size - elapsed + self.window_size * (1 - self.max_requests / max(current, 1))
+            return max(1, math.ceil(wait))
 
 # Create a rate limiter instance
 rate_limiter = RateLimiter(RATE_LIMIT_WINDOW, RATE_LIMIT_REQUESTS)
@@ -127,40 +288,54 @@ def before_request():
     ip_address = request.remote_addr
     
     if rate_limiter.is_rate_limited(ip_address):
-        logger.warning(f"Rate limit exceeded for IP: {ip_address}, endpoint: {request.path}")
-        return jsonify({
+        logger.warning("Rate limit exceeded for IP: %s, endpoint: %s", ip_address, request.path)
+        response = json_response({
             'error': 'Rate limit exceeded',
             'message': f'Maximum {RATE_LIMIT_REQUESTS} requests per {RATE_LIMIT_WINDOW} seconds'
-        }), 429  # 429 Too Many Requests
+        }, 429)  # 429 Too Many Requests
+        response.headers['Retry-After'] = str(rate_limiter.retry_after(ip_address))
+        return response
     
     # Log request details in debug mode
     if DEBUG_MODE:
-        logger.debug(f"Request from {ip_address}: {request.method} {request.path}")
+        logger.debug("Request from %s: %s %s", ip_address, request.method, request.path)
+
+# (second, formatted UTC timestamp) for X-Response-Time, reformatted once a second
+response_time_header: Tuple[int, str] = (0, '')
 
 # Response compression and additional headers
 @app.after_request
 def after_request(response):
     """Add security headers and compress response if needed"""
+    global response_time_header
+    
     # Add security headers
-    response.headers.add('X-Content-Type-Options', 'nosniff')
-    response.headers.add('X-Frame-Options', 'DENY')
-    response.headers.add('X-XSS-Protection', '1; mode=block')
-    response.headers.add('Cache-Control', f'public, max-age={CACHE_SECONDS}')
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.headers['X-Frame-Options'] = 'DENY'
+    response.headers['X-XSS-Protection'] = '1; mode=block'
+    response.headers.setdefault('Cache-Control', f'public, max-age={CACHE_SECONDS}')
     
     # Add response timestamp
-    response.headers.add('X-Response-Time', datetime.utcnow().isoformat())
+    now = int(time.time())
+    if response_time_header[0] != now:
+        response_time_header = (now, datetime.utcfromtimestamp(now).isoformat() + 'Z')
+    response.headers['X-Response-Time'] = response_time_header[1]
     
     # Apply compression if enabled and response is large enough
     if (ENABLE_COMPRESSION and 
         response.status_code == 200 and
         not response.direct_passthrough and
+        'Content-Encoding' not in response.headers and
         (response.content_length is None or response.content_length > MIN_SIZE_TO_COMPRESS) and
         'gzip' in request.headers.get('Accept-Encoding', '')):
         
-        compressed_data = gzip.compress(response.data)
+        # Level 1: several times faster than the default 9 on the Pi, and small
+        # JSON bodies compress nearly as well
+        compressed_data = gzip.compress(response.data, compresslevel=1)
         response.data = compressed_data
         response.headers['Content-Encoding'] = 'gzip'
         response.headers['Content-Length'] = len(compressed_data)
+        response.vary.add('Accept-Encoding')
     
     return response
 
@@ -550,38 +725,94 @@ for proc in processes:
 </html>
 """
 
+# The documentation page has no template variables, so encode it once up front
+INDEX_HTML_BYTES = HTML_TEMPLATE.encode('utf-8')
+# Compressed once at the highest level instead of per request in after_request
+INDEX_HTML_GZ = gzip.compress(INDEX_HTML_BYTES, compresslevel=9)
+# Content hash, so revisiting browsers get a 304 until the page itself changes
+INDEX_HTML_ETAG = hashlib.sha1(INDEX_HTML_BYTES).hexdigest()
+
 # Improved caching mechanism
 class StatCache:
+    # Distinct field subsets whose serialization is kept per entry
+    SUBSET_MEMO_SIZE = 32
+    
     def __init__(self, ttl_seconds: int):
         self.cache = {}
         self.ttl = ttl_seconds
         self.lock = threading.Lock()
     
-    def get(self, key: str, fields: List[str] = None):
+    def _get_entry(self, key: str) -> Optional[Tuple[Dict, float, bytes, Optional[bytes], Dict]]:
+        """
+        Get the (data, timestamp, body, gzipped body, subset memo) entry for a
+        key if it hasn't expired
+        """
+        entry = self.cache.get(key)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            return None
+        return entry
+    
+    def get(self, key: str, fields: Optional[Set[str]] = None):
         """Get cached data, optionally filtered by fields"""
         with self.lock:
-            if key not in self.cache:
+            entry = self._get_entry(key)
+            if entry is None:
                 return None
                 
-            data, timestamp = self.cache[key]
-            
-            if time.time() - timestamp > self.ttl:
-                return None
+            data = entry[0]
                 
             if fields:
-                filtered_data = {}
-                for field in fields:
-                    field = field.strip()
-                    if field in data:
-                        filtered_data[field] = data[field]
-                return filtered_data
+                return {k: v for k, v in data.items() if k in fields}
             
             return data
     
+    def get_bytes(self, key: str, gzipped: bool = False) -> Optional[Tuple[bytes, float, Optional[str]]]:
+        """
+        Get the cached data already serialized to JSON bytes.
+        
+        Returns:
+            (body, timestamp, content encoding) or None if not cached; the
+            gzipped body is returned when requested and available
+        """
+        with self.lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                return None
+            if gzipped and entry[3] is not None:
+                return entry[3], entry[1], 'gzip'
+            return entry[2], entry[1], None
+    
+    def get_subset_bytes(self, key: str, fields: FrozenSet[str]) -> Optional[bytes]:
+        """
+        Get the cached data restricted to fields, serialized to JSON bytes.
+        Repeat queries for the same fields reuse the serialization until the
+        entry is replaced.
+        
+        Returns:
+            JSON body ({} if none of the fields exist) or None if not cached
+        """
+        with self.lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                return None
+            memo = entry[4]
+            body = memo.get(fields)
+            if body is None:
+                subset = {k: v for k, v in entry[0].items() if k in fields}
+                body = orjson.dumps(subset, option=OrjsonProvider.OPTIONS)
+                if len(memo) < self.SUBSET_MEMO_SIZE:
+                    memo[fields] = body
+            return body
+    
     def set(self, key: str, data: Dict):
-        """Store data in cache with current timestamp"""
+        """Store data and its JSON serialization (plain and gzipped) in cache with current timestamp"""
+        body = orjson.dumps(data, option=OrjsonProvider.OPTIONS)
+        body_gz = None
+        if ENABLE_COMPRESSION and len(body) > MIN_SIZE_TO_COMPRESS:
+            # Fast compression level; the result is reused for the whole cache window
+            body_gz = gzip.compress(body, compresslevel=1)
         with self.lock:
-            self.cache[key] = (data, time.time())
+            self.cache[key] = (data, time.time(), body, body_gz, {})
             
     def clear(self):
         """Clear all cached data"""
@@ -591,66 +822,294 @@ class StatCache:
 # Initialize cache with configured TTL
 stats_cache = StatCache(CACHE_SECONDS)
 
-def run_command(command: Union[str, List[str]], args: List[str] = None, 
-                timeout: int = 5) -> Optional[str]:
+# Recent samples of a few headline metrics, for /metrics/history
+class MetricsHistory:
+    METRICS = ('cpu', 'memory', 'temp', 'net_rx', 'net_tx')
+    
+    def __init__(self, size: int):
+        self.size = size
+        # One flat array per metric, all sharing a slot index; missing values are NaN
+        self.timestamps = array('d', [0.0]) * size
+        self.values = {metric: array('d', [math.nan]) * size for metric in self.METRICS}
+        self.count = 0
+        self.next_slot = 0
+        self.lock = threading.Lock()
+    
+    def record(self, stats: Dict):
+        """Append the headline metrics of a /stats snapshot, overwriting the oldest"""
+        network = [iface for iface in stats.get('network', {}).values() if isinstance(iface, dict)]
+        sample = {
+            'cpu': stats.get('cpu_usage'),
+            'memory': stats.get('memory', {}).get('percent'),
+            'temp': stats.get('cpu_temp'),
+            'net_rx': sum(iface.get('bytes_recv', 0) for iface in network) if network else None,
+            'net_tx': sum(iface.get('bytes_sent', 0) for iface in network) if network else None
+        }
+        with self.lock:
+            slot = self.next_slot
+            self.timestamps[slot] = stats.get('timestamp', time.time())
+            for metric, value in sample.items():
+                self.values[metric][slot] = math.nan if value is None else value
+            self.next_slot = (slot + 1) % self.size
+            self.count = min(self.count + 1, self.size)
+    
+    def since(self, start: float, metrics: Tuple[str, ...]) -> Dict[str, List]:
+        """
+        Get the samples taken at or after start, oldest first.
+        
+        Returns:
+            dict: 'timestamps' plus one list per requested metric (None where unavailable)
+        """
+        with self.lock:
+            first = (self.next_slot - self.count) % self.size
+            slots = [(first + i) % self.size for i in range(self.count)]
+            slots = [slot for slot in slots if self.timestamps[slot] >= start]
+            history = {'timestamps': [self.timestamps[slot] for slot in slots]}
+            for metric in metrics:
+                column = self.values[metric]
+                history[metric] = [None if math.isnan(column[slot]) else column[slot] for slot in slots]
+        return history
+
+metrics_history = MetricsHistory(HISTORY_SIZE)
+
+# Shared pool for running the I/O-bound stats collectors concurrently
+collector_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix='collector')
+COLLECTOR_TIMEOUT = 2  # Maximum seconds to wait for a single collector
+
+# Background sampler so /stats requests don't pay for metric collection
+class Sampler:
+    def __init__(self, name: str, interval: int, sample: Callable[[], None], idle_timeout: int = 0):
+        self.name = name
+        self.interval = interval
+        self.sample = sample
+        # Pause after this many seconds without touch(); 0 keeps sampling regardless
+        self.idle_timeout = idle_timeout
+        self.last_demand = time.monotonic()
+        self.demand_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the sampler thread if it isn't already running"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name=f'{self.name}-sampler', daemon=True)
+        self.thread.start()
+        logger.info("%s sampler started, refreshing every %ss", self.name.capitalize(), self.interval)
+    
+    def stop(self):
+        """Signal the sampler thread to exit"""
+        self.stop_event.set()
+        self.demand_event.set()
+    
+    def touch(self):
+        """Record that a client wants samples, waking the sampler if it went idle"""
+        self.last_demand = time.monotonic()
+        self.demand_event.set()
+    
+    def _idle(self) -> bool:
+        return bool(self.idle_timeout) and time.monotonic() - self.last_demand > self.idle_timeout
+    
+    def _run(self):
+        """Take a sample every interval until stopped"""
+        next_run = time.monotonic()
+        while not self.stop_event.is_set():
+            if self._idle():
+                # Nobody is polling: sleep until a request touches us, re-checking
+                # after the clear so a touch in between isn't lost
+                self.demand_event.clear()
+                if self._idle():
+                    logger.debug("%s sampler idle, pausing", self.name.capitalize())
+                    self.demand_event.wait()
+                # The waking request takes its own sample; sampling again right away
+                # would measure CPU usage over a few milliseconds, so wait an interval
+                next_run = time.monotonic() + self.interval
+                self.stop_event.wait(self.interval)
+                continue
+            
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error("%s sampler failed: %s", self.name.capitalize(), e)
+            # Fixed rate, so a snapshot is replaced right as it reaches the interval's age
+            next_run += self.interval
+            self.stop_event.wait(max(next_run - time.monotonic(), 0))
+
+def refresh_stats_cache():
+    """Collect a fresh stats snapshot into the cache and the metrics history"""
+    stats = collect_system_stats()
+    stats_cache.set('system_stats', stats)
+    metrics_history.record(stats)
+
+stats_sampler = Sampler('stats', CACHE_SECONDS, refresh_stats_cache)
+
+# Upper bound for a single command so a wedged vcgencmd can't stall collection
+COMMAND_TIMEOUT = 0.5
+
+def run_command(argv: List[str], timeout: float = COMMAND_TIMEOUT) -> Optional[str]:
     """
-    Execute a shell command and return its output with timeout.
+    Execute a command without a shell and return its output with timeout.
     
     Args:
-        command: The command to execute (string or list)
-        args: List of arguments for the command
+        argv: The command and its arguments
         timeout: Maximum execution time in seconds
     
     Returns:
         Command output or None if execution failed
     """
     try:
-        if isinstance(command, list) or args:
-            cmd = command if isinstance(command, list) else [command]
-            if args:
-                cmd.extend(args)
-            # Safer execution without shell=True
-            result = subprocess.run(
-                cmd, 
-                shell=False, 
-                check=True, 
-                text=True, 
-                capture_output=True,
-                timeout=timeout
-            )
-        else:
-            # Some commands might still need shell=True, but we're careful about inputs
-            result = subprocess.run(
-                command, 
-                shell=True, 
-                check=True, 
-                text=True, 
-                capture_output=True,
-                timeout=timeout
-            )
+        result = subprocess.run(
+            argv, 
+            shell=False, 
+            check=True, 
+            text=True, 
+            capture_output=True,
+            timeout=timeout
+        )
         return result.stdout.strip()
     except subprocess.TimeoutExpired:
-        logger.warning(f"Command timed out after {timeout}s: {command} {args if args else ''}")
+        logger.warning("Command timed out after %ss: %s", timeout, argv)
         return None
     except subprocess.CalledProcessError as e:
-        logger.warning(f"Command failed: {command} {args if args else ''}, return code: {e.returncode}")
+        logger.warning("Command failed: %s, return code: %s", argv, e.returncode)
         return None
     except Exception as e:
-        logger.error(f"Error executing command '{command}': {str(e)}")
+        logger.error("Error executing command %s: %s", argv, e)
         return None
 
-# Apply LRU cache to expensive operations that don't change often
-@lru_cache(maxsize=32, typed=True)
-def get_hardware_info_cached() -> Dict:
+class VcgencmdShell:
+    """
+    Long-running shell that executes vcgencmd scripts fed over its stdin, so each
+    poll avoids spawning a fresh process from the (large) Python interpreter.
+    """
+    
+    END_MARKER = '__PISTAT_END__'
+    
+    def __init__(self, timeout: float = COMMAND_TIMEOUT):
+        self.timeout = timeout
+        self.proc = None
+        self.lock = threading.Lock()
+    
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+    
+    def run(self, script: str) -> Optional[str]:
+        """
+        Execute a one-line shell script in the coprocess and return its output.
+        
+        Args:
+            script: Shell commands to run; they must not read stdin
+        
+        Returns:
+            Command output or None if the coprocess failed or timed out
+        """
+        marker = self.END_MARKER.encode()
+        with self.lock:
+            try:
+                if self.proc is None or self.proc.poll() is not None:
+                    self.proc = self._spawn()
+                self.proc.stdin.write(f"{script}; echo {self.END_MARKER}\n".encode())
+                
+                output = b''
+                fd = self.proc.stdout.fileno()
+                deadline = time.monotonic() + self.timeout
+                while not output.endswith(marker + b'\n'):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                        raise subprocess.TimeoutExpired("sh", self.timeout)
+                    chunk = os.read(fd, 4096)
+                    if not chunk:
+                        raise BrokenPipeError("vcgencmd shell exited")
+                    output += chunk
+                return output[:-len(marker) - 1].decode(errors='replace').strip()
+            except subprocess.TimeoutExpired:
+                logger.warning("vcgencmd shell timed out after %ss, restarting", self.timeout)
+            except Exception as e:
+                logger.error("vcgencmd shell failed: %s", e)
+            # Output may be out of sync with our commands now; start afresh next time
+            self._close()
+            return None
+    
+    def _close(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+    
+    def stop(self):
+        """Terminate the coprocess."""
+        with self.lock:
+            self._close()
+
+# vcgencmd queries collected together in a single shell round-trip per poll
+VCGENCMD_QUERIES = (
+    'measure_temp',
+    'get_mem gpu',
+    'measure_clock v3d',
+    'measure_volts core',
+    'get_throttled',
+    'measure_clock arm',
+    'measure_clock core',
+    'measure_clock sdram',
+)
+VCGENCMD_SEPARATOR = '---'
+
+# The queries run one after another through the firmware mailbox, so the batch
+# gets a command's budget per query; slow Pis can't fit all of them in one
+VCGENCMD_TIMEOUT = COMMAND_TIMEOUT * len(VCGENCMD_QUERIES)
+
+vcgencmd_shell = VcgencmdShell(timeout=VCGENCMD_TIMEOUT)
+
+def vcgencmd_batch() -> Dict[str, str]:
+    """
+    Run all vcgencmd queries in the persistent shell instead of forking vcgencmd per metric.
+    
+    Returns:
+        dict: Raw output keyed by query (e.g. 'measure_clock arm'), failed queries omitted
+    """
+    if not IS_RASPBERRY_PI:
+        return {}
+    
+    script = f"; echo {VCGENCMD_SEPARATOR}; ".join(f"vcgencmd {query} </dev/null" for query in VCGENCMD_QUERIES)
+    output = vcgencmd_shell.run(f"{script}; echo {VCGENCMD_SEPARATOR}")
+    if not output:
+        return {}
+    
+    results = {}
+    for query, chunk in zip(VCGENCMD_QUERIES, output.split(VCGENCMD_SEPARATOR)):
+        chunk = chunk.strip()
+        # vcgencmd reports failures as "error=N error_msg=..."
+        if chunk and not chunk.startswith('error='):
+            results[query] = chunk
+    return results
+
+def vcgencmd_value(output: str) -> Optional[str]:
     """
-    Cached version of hardware info - doesn't change during runtime
+    Extract the value from vcgencmd 'key=value' output, e.g. "temp=45.8'C".
+    
+    Args:
+        output: Raw vcgencmd output
+    
+    Returns:
+        The text after the first '=' or None if the output has no value
     """
-    return get_hardware_info()
+    _, sep, value = output.partition('=')
+    return value.strip() if sep else None
 
-def get_gpu_info():
+def get_gpu_info(vcgen: Optional[Dict[str, str]] = None):
     """
     Get GPU information from vcgencmd.
     
+    Args:
+        vcgen: Pre-collected vcgencmd_batch() output, queried if not given
+    
     Returns:
         dict: Dictionary containing GPU metrics or empty dict if unavailable
     """
@@ -660,36 +1119,42 @@ def get_gpu_info():
         logger.debug("GPU info not available - not running on Raspberry Pi")
         return gpu_info
     
+    if vcgen is None:
+        vcgen = vcgencmd_batch()
+    
     try:
         # GPU temperature
-        gpu_temp = run_command("vcgencmd", ["measure_temp"])
+        gpu_temp = vcgen.get('measure_temp')
         if gpu_temp:
-            match = re.search(r'temp=(\d+\.\d+)', gpu_temp)
-            if match:
-                gpu_info['temperature'] = float(match.group(1))
+            value = vcgencmd_value(gpu_temp)
+            if value:
+                gpu_info['temperature'] = float(value.rstrip("'C"))
         
         # GPU memory
-        gpu_mem = run_command("vcgencmd", ["get_mem", "gpu"])
+        gpu_mem = vcgen.get('get_mem gpu')
         if gpu_mem:
-            match = re.search(r'(\d+)M', gpu_mem)
-            if match:
-                gpu_info['memory'] = int(match.group(1)) * 1024 * 1024  # Convert MB to bytes
+            value = vcgencmd_value(gpu_mem)
+            if value:
+                gpu_info['memory'] = int(value.rstrip('M')) * 1024 * 1024  # Convert MB to bytes
         
         # V3D utilization
-        v3d_freq = run_command("vcgencmd", ["measure_clock", "v3d"])
+        v3d_freq = vcgen.get('measure_clock v3d')
         if v3d_freq:
-            match = re.search(r'=(\d+)', v3d_freq)
-            if match:
-                gpu_info['v3d_clock'] = int(match.group(1))
+            value = vcgencmd_value(v3d_freq)
+            if value:
+                gpu_info['v3d_clock'] = int(value)
     except Exception as e:
-        logger.error(f"Error getting GPU info: {str(e)}")
+        logger.error("Error getting GPU info: %s", e)
     
     return gpu_info
 
-def get_power_info():
+def get_power_info(vcgen: Optional[Dict[str, str]] = None):
     """
     Get power information from vcgencmd.
     
+    Args:
+        vcgen: Pre-collected vcgencmd_batch() output, queried if not given
+    
     Returns:
         dict: Dictionary containing power metrics or empty dict if unavailable
     """
@@ -699,32 +1164,38 @@ def get_power_info():
         logger.debug("Power info not available - not running on Raspberry Pi")
         return power_info
     
+    if vcgen is None:
+        vcgen = vcgencmd_batch()
+    
     try:
         # Current voltage
-        voltage = run_command("vcgencmd", ["measure_volts", "core"])
+        voltage = vcgen.get('measure_volts core')
         if voltage:
-            match = re.search(r'(\d+\.\d+)V', voltage)
-            if match:
-                power_info['core_voltage'] = float(match.group(1))
+            value = vcgencmd_value(voltage)
+            if value:
+                power_info['core_voltage'] = float(value.rstrip('V'))
         
         # Throttling status
-        throttled = run_command("vcgencmd", ["get_throttled"])
+        throttled = vcgen.get('get_throttled')
         if throttled:
-            match = re.search(r'0x(\w+)', throttled)
-            if match:
-                throttle_value = int(match.group(1), 16)
+            value = vcgencmd_value(throttled)
+            if value:
+                throttle_value = int(value, 16)
                 power_info['under_voltage'] = bool(throttle_value & 0x1)
                 power_info['freq_capped'] = bool(throttle_value & 0x2)
                 power_info['throttled'] = bool(throttle_value & 0x4)
     except Exception as e:
-        logger.error(f"Error getting power info: {str(e)}")
+        logger.error("Error getting power info: %s", e)
     
     return power_info
 
-def get_clock_info():
+def get_clock_info(vcgen: Optional[Dict[str, str]] = None):
     """
     Get various clock frequencies from vcgencmd.
     
+    Args:
+        vcgen: Pre-collected vcgencmd_batch() output, queried if not given
+    
     Returns:
         dict: Dictionary containing clock frequencies or empty dict if unavailable
     """
@@ -734,110 +1205,200 @@ def get_clock_info():
         logger.debug("Clock info not available - not running on Raspberry Pi")
         return clock_info
     
+    if vcgen is None:
+        vcgen = vcgencmd_batch()
+    
     try:
-        # ARM clock
-        arm_freq = run_command("vcgencmd", ["measure_clock", "arm"])
-        if arm_freq:
-            match = re.search(r'=(\d+)', arm_freq)
-            if match:
-                clock_info['arm'] = int(match.group(1))
-        
-        # Core clock
-        core_freq = run_command("vcgencmd", ["measure_clock", "core"])
-        if core_freq:
-            match = re.search(r'=(\d+)', core_freq)
-            if match:
-                clock_info['core'] = int(match.group(1))
-        
-        # SDRAM clock
-        sdram_freq = run_command("vcgencmd", ["measure_clock", "sdram"])
-        if sdram_freq:
-            match = re.search(r'=(\d+)', sdram_freq)
-            if match:
-                clock_info['sdram'] = int(match.group(1))
+        # ARM, core and SDRAM clocks
+        for clock in ('arm', 'core', 'sdram'):
+            freq = vcgen.get(f'measure_clock {clock}')
+            if freq:
+                value = vcgencmd_value(freq)
+                if value:
+                    clock_info[clock] = int(value)
     except Exception as e:
-        logger.error(f"Error getting clock info: {str(e)}")
+        logger.error("Error getting clock info: %s", e)
     
     return clock_info
 
-def get_network_details():
+def get_wireless_signal_levels() -> Dict[str, int]:
+    """
+    Get WiFi signal levels from /proc/net/wireless instead of forking iwconfig.
+    
+    Returns:
+        dict: Signal level in dBm keyed by wireless interface name
+    """
+    levels = {}
+    
+    try:
+        with open('/proc/net/wireless', 'r') as f:
+            # Skip the two header lines
+            lines = f.readlines()[2:]
+    except OSError:
+        return levels
+    
+    for line in lines:
+        # Format: iface: status link level noise ...
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        try:
+            levels[parts[0].rstrip(':')] = int(float(parts[3]))
+        except ValueError:
+            logger.warning("Could not parse WiFi signal line: %s", line.strip())
+    
+    return levels
+
+@ttl_cache(CONNECTIONS_TTL)
+def count_active_connections() -> int:
+    """
+    Count inet sockets by line-counting /proc/net tables instead of building
+    a psutil object per connection; reused for CONNECTIONS_TTL seconds.
+    
+    Returns:
+        int: Number of TCP and UDP sockets (IPv4 and IPv6)
+    """
+    if PLATFORM_SYSTEM != "Linux":
+        return len(psutil.net_connections())
+    
+    count = 0
+    for table in ('/proc/net/tcp', '/proc/net/tcp6', '/proc/net/udp', '/proc/net/udp6'):
+        try:
+            with open(table, 'rb') as f:
+                # First line is the column header
+                count += max(f.read().count(b'\n') - 1, 0)
+        except OSError:
+            pass
+    return count
+
+def get_network_details(verbose: bool = False):
     """
     Get detailed network interface information.
     
+    Args:
+        verbose (bool): Include packet, error and drop counters, not just byte counts
+    
     Returns:
         dict: Dictionary containing network interface statistics
     """
     network_info = {}
     
     try:
+        signal_levels = get_wireless_signal_levels()
+        
         # Get all network interfaces
         for interface, stats in psutil.net_io_counters(pernic=True).items():
             # Skip loopback
             if interface == 'lo':
                 continue
                 
-            network_info[interface] = {
-                'bytes_sent': stats.bytes_sent,
-                'bytes_recv': stats.bytes_recv,
-                'packets_sent': stats.packets_sent,
-                'packets_recv': stats.packets_recv,
-                'errin': stats.errin,
-                'errout': stats.errout,
-                'dropin': stats.dropin,
-                'dropout': stats.dropout
-            }
+            if verbose:
+                network_info[interface] = {
+                    'bytes_sent': stats.bytes_sent,
+                    'bytes_recv': stats.bytes_recv,
+                    'packets_sent': stats.packets_sent,
+                    'packets_recv': stats.packets_recv,
+                    'errin': stats.errin,
+                    'errout': stats.errout,
+                    'dropin': stats.dropin,
+                    'dropout': stats.dropout
+                }
+            else:
+                network_info[interface] = {
+                    'bytes_sent': stats.bytes_sent,
+                    'bytes_recv': stats.bytes_recv
+                }
             
             # Add WiFi signal info if available and it's a wireless interface
-            if interface.startswith('wlan'):
-                try:
-                    wifi_signal = run_command(f"iwconfig {interface} | grep 'Signal level'")
-                    if wifi_signal:
-                        match = re.search(r'Signal level=(-\d+) dBm', wifi_signal)
-                        if match:
-                            network_info[interface]['signal_strength'] = int(match.group(1))
-                except Exception as e:
-                    logger.warning(f"Could not get WiFi signal for {interface}: {str(e)}")
+            if interface in signal_levels:
+                network_info[interface]['signal_strength'] = signal_levels[interface]
         
         # Count active connections
-        connections = len(psutil.net_connections())
-        network_info['active_connections'] = connections
+        network_info['active_connections'] = count_active_connections()
     except Exception as e:
-        logger.error(f"Error getting network details: {str(e)}")
+        logger.error("Error getting network details: %s", e)
         return {}
     
     return network_info
 
-def get_hardware_info():
+# Seconds /network/interfaces reuses a reading; /stats reads the byte counters fresh
+# since the metrics history turns them into rates
+NETWORK_DETAILS_TTL = 5
+
+@ttl_cache(NETWORK_DETAILS_TTL, maxsize=2)
+def get_cached_network_details(verbose: bool = False) -> Dict:
+    """
+    Get network interface information, refreshed at most every NETWORK_DETAILS_TTL seconds.
+    
+    Returns:
+        dict: As get_network_details(); shared, so callers must not modify it
+    """
+    return get_network_details(verbose)
+
+def get_static_hardware_info() -> Dict:
     """
-    Get Raspberry Pi hardware information.
+    Get hardware information that cannot change while the system is running.
     
     Returns:
-        dict: Dictionary containing hardware information
+        dict: Dictionary containing model, serial number and firmware version
     """
     hardware_info = {}
     
     try:
         # Model information
-        model_info = run_command("cat /proc/device-tree/model")
-        if model_info:
-            hardware_info['model'] = model_info
+        try:
+            with open('/proc/device-tree/model', 'r') as f:
+                model_info = f.read().rstrip('\x00').strip()
+            if model_info:
+                hardware_info['model'] = model_info
+        except OSError:
+            pass
         
         # Serial number
-        serial = run_command("cat /proc/cpuinfo | grep Serial | cut -d ' ' -f 2")
-        if serial:
-            hardware_info['serial'] = serial
+        try:
+            with open('/proc/cpuinfo', 'r') as f:
+                for line in f:
+                    if line.startswith('Serial'):
+                        hardware_info['serial'] = line.partition(':')[2].strip()
+                        break
+        except OSError:
+            pass
         
         # Firmware version
-        firmware = run_command("vcgencmd", ["version"])
-        if firmware:
-            hardware_info['firmware'] = firmware
-        
-        # Check for connected devices
-        usb_devices = run_command("lsusb")
-        if usb_devices:
-            hardware_info['usb_devices'] = len(usb_devices.splitlines())
+        if IS_RASPBERRY_PI:
+            firmware = run_command(["vcgencmd", "version"])
+            if firmware:
+                hardware_info['firmware'] = firmware
     except Exception as e:
-        logger.error(f"Error getting hardware info: {str(e)}")
+        logger.error("Error getting static hardware info: %s", e)
+    
+    return hardware_info
+
+# Model, serial and firmware are read once at startup
+STATIC_HARDWARE_INFO = get_static_hardware_info()
+
+# The remaining hardware details (attached USB devices) change far less often than /stats is sampled
+HARDWARE_INFO_TTL = 60
+
+@ttl_cache(HARDWARE_INFO_TTL)
+def get_hardware_info():
+    """
+    Get Raspberry Pi hardware information, refreshed at most every HARDWARE_INFO_TTL seconds.
+    
+    Returns:
+        dict: Dictionary containing hardware information; shared, so callers must not modify it
+    """
+    hardware_info = dict(STATIC_HARDWARE_INFO)
+    
+    try:
+        # Check for connected devices (entries with ':' are interfaces, not devices)
+        hardware_info['usb_devices'] = sum(
+            1 for entry in os.listdir('/sys/bus/usb/devices') if ':' not in entry
+        )
+    except OSError:
+        pass
+    except Exception as e:
+        logger.error("Error getting hardware info: %s", e)
     
     return hardware_info
 
@@ -857,9 +1418,47 @@ def get_swap_info():
             'percent': swap.percent
         }
     except Exception as e:
-        logger.error(f"Error getting swap info: {str(e)}")
+        logger.error("Error getting swap info: %s", e)
         return {}
 
+# /proc/diskstats always counts in 512-byte sectors, whatever the device's sector size
+DISKSTATS_SECTOR_SIZE = 512
+
+def read_diskstats() -> Optional[Dict]:
+    """
+    Sum I/O counters for whole disks straight from /proc/diskstats, skipping
+    partitions (already counted in their disk) and loop/RAM devices.
+    
+    Returns:
+        dict: Aggregate disk I/O counters or None if /proc/diskstats is unavailable
+    """
+    try:
+        disks = set(os.listdir('/sys/block'))
+        totals = [0, 0, 0, 0, 0, 0]
+        with open('/proc/diskstats') as f:
+            for line in f:
+                fields = line.split()
+                name = fields[2]
+                if name not in disks or name.startswith(('loop', 'ram', 'zram')):
+                    continue
+                totals[0] += int(fields[3])   # reads completed
+                totals[1] += int(fields[7])   # writes completed
+                totals[2] += int(fields[5])   # sectors read
+                totals[3] += int(fields[9])   # sectors written
+                totals[4] += int(fields[6])   # ms spent reading
+                totals[5] += int(fields[10])  # ms spent writing
+    except (OSError, IndexError, ValueError):
+        return None
+    
+    return {
+        'read_count': totals[0],
+        'write_count': totals[1],
+        'read_bytes': totals[2] * DISKSTATS_SECTOR_SIZE,
+        'write_bytes': totals[3] * DISKSTATS_SECTOR_SIZE,
+        'read_time': totals[4],
+        'write_time': totals[5]
+    }
+
 def get_disk_io():
     """
     Get disk I/O statistics.
@@ -867,6 +1466,11 @@ def get_disk_io():
     Returns:
         dict: Dictionary containing disk I/O statistics
     """
+    if PLATFORM_SYSTEM == "Linux":
+        disk_io = read_diskstats()
+        if disk_io is not None:
+            return disk_io
+    
     try:
         disk_io = psutil.disk_io_counters()
         if disk_io:
@@ -879,10 +1483,95 @@ def get_disk_io():
                 'write_time': disk_io.write_time
             }
     except Exception as e:
-        logger.error(f"Error getting disk I/O info: {str(e)}")
+        logger.error("Error getting disk I/O info: %s", e)
     
     return {}
 
+@ttl_cache(1)
+def get_virtual_memory():
+    """
+    Get system memory usage, reusing the reading taken earlier in the same second.
+    
+    Returns:
+        psutil svmem named tuple
+    """
+    return psutil.virtual_memory()
+
+class SysfsAttribute:
+    """
+    Small sysfs/procfs file that is kept open and re-read with pread, since
+    the kernel regenerates its contents on every read from offset 0.
+    """
+    
+    def __init__(self, path: str, size: int = 64):
+        self.path = path
+        self.size = size
+        self.fd = None
+        self.lock = threading.Lock()
+    
+    def read(self) -> bytes:
+        """
+        Read the current contents of the file.
+        
+        Returns:
+            bytes: Up to size bytes of the file
+        
+        Raises:
+            OSError: If the file can't be opened or read; it is reopened on the next call
+        """
+        if not hasattr(os, 'pread'):
+            with open(self.path, 'rb') as f:
+                return f.read(self.size)
+        
+        fd = self.fd
+        if fd is None:
+            with self.lock:
+                if self.fd is None:
+                    self.fd = os.open(self.path, os.O_RDONLY)
+                fd = self.fd
+        try:
+            return os.pread(fd, self.size, 0)
+        except OSError:
+            self.close()
+            raise
+    
+    def close(self):
+        """Close the file descriptor, if open"""
+        with self.lock:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+
+cpu_thermal_zone = SysfsAttribute('/sys/class/thermal/thermal_zone0/temp')
+
+def get_cpu_temperature() -> Optional[float]:
+    """
+    Get CPU temperature, read straight from the thermal zone in sysfs.
+    
+    Returns:
+        float: CPU temperature in Celsius or None if unavailable
+    """
+    try:
+        return int(cpu_thermal_zone.read()) / 1000.0  # Millidegrees to Celsius
+    except (OSError, ValueError):
+        pass
+    
+    # Fall back to psutil's full sensor scan
+    try:
+        temps = psutil.sensors_temperatures()
+        if 'cpu_thermal' in temps:
+            return temps['cpu_thermal'][0].current  # Temperature in Celsius
+    except Exception as e:
+        logger.debug("Failed to get CPU temperature: %s", e)
+    return None
+
+# Non-blocking CPU readings closer together than this reuse the previous one; a
+# shorter measurement window than /proc/stat's tick resolution is mostly noise
+CPU_MIN_INTERVAL = 0.5
+
+# (monotonic time, overall usage, per-CPU usage) of the last reading
+last_cpu_sample: Tuple[float, float, List[float]] = (float('-inf'), 0.0, [])
+
 def get_cpu_usage(block=False):
     """
     Get CPU usage percentage.
@@ -894,19 +1583,108 @@ def get_cpu_usage(block=False):
         float: CPU usage percentage
         list: Per-CPU usage percentages
     """
+    global last_cpu_sample
+    
     try:
-        if block:
-            cpu_usage = psutil.cpu_percent(interval=1)
-            per_cpu_usage = psutil.cpu_percent(interval=0, percpu=True)
-        else:
-            cpu_usage = psutil.cpu_percent(interval=0)
-            per_cpu_usage = psutil.cpu_percent(interval=0, percpu=True)
+        sampled_at, cpu_usage, per_cpu_usage = last_cpu_sample
+        if not block and time.monotonic() - sampled_at < CPU_MIN_INTERVAL:
+            return cpu_usage, per_cpu_usage
+        
+        # One per-CPU sample; the overall usage is its mean
+        per_cpu_usage = psutil.cpu_percent(interval=1 if block else 0, percpu=True)
+        cpu_usage = sum(per_cpu_usage) / len(per_cpu_usage) if per_cpu_usage else 0.0
+        last_cpu_sample = (time.monotonic(), cpu_usage, per_cpu_usage)
         return cpu_usage, per_cpu_usage
     except Exception as e:
-        logger.error(f"Error getting CPU usage: {str(e)}")
+        logger.error("Error getting CPU usage: %s", e)
         return 0.0, []
 
-@app.route('/', methods=['GET'])
+def collect_system_stats(block: bool = False) -> Dict:
+    """
+    Collect the full set of system statistics served by /stats.
+    
+    Args:
+        block (bool): Whether to block for 1 second for more accurate CPU readings
+    
+    Returns:
+        dict: System statistics
+    """
+    stats = {}
+    
+    # Start the I/O-bound collectors (subprocesses, /proc and sysfs reads) concurrently
+    futures = {
+        'vcgencmd': collector_pool.submit(vcgencmd_batch),
+        'swap': collector_pool.submit(get_swap_info),
+        'disk_io': collector_pool.submit(get_disk_io),
+        'network': collector_pool.submit(get_network_details),
+        'hardware': collector_pool.submit(get_hardware_info),
+    }
+    
+    # Get CPU temperature
+    stats['cpu_temp'] = get_cpu_temperature()
+
+    # Get CPU frequency (in MHz)
+    try:
+        cpu_freq_info = psutil.cpu_freq()
+        cpu_freq = cpu_freq_info.current if cpu_freq_info else None
+        stats['cpu_freq'] = cpu_freq
+    except Exception as e:
+        logger.debug("Failed to get CPU frequency: %s", e)
+        stats['cpu_freq'] = None
+
+    # Get CPU usage percentage
+    try:
+        cpu_usage, per_cpu_usage = get_cpu_usage(block=block)
+        stats['cpu_usage'] = cpu_usage
+        stats['per_cpu_usage'] = per_cpu_usage
+    except Exception as e:
+        logger.warning("Failed to get CPU usage: %s", e)
+        stats['cpu_usage'] = None
+        stats['per_cpu_usage'] = []
+
+    # Get memory usage
+    try:
+        memory = get_virtual_memory()
+        stats['memory'] = {
+            'total': memory.total,      # Total memory in bytes
+            'available': memory.available,  # Available memory in bytes
+            'used': memory.used,        # Used memory in bytes
+            'percent': memory.percent   # Percentage used
+        }
+    except Exception as e:
+        logger.warning("Failed to get memory info: %s", e)
+        stats['memory'] = {}
+
+    # Gather the concurrent collectors
+    results = {}
+    for key, future in futures.items():
+        try:
+            # The vcgencmd batch has its own, longer deadline inside the shell
+            timeout = max(COLLECTOR_TIMEOUT, VCGENCMD_TIMEOUT) if key == 'vcgencmd' else COLLECTOR_TIMEOUT
+            results[key] = future.result(timeout=timeout)
+        except Exception as e:
+            logger.warning("Failed to collect %s stats: %s", key, e)
+            results[key] = {}
+    
+    # Add other metrics
+    stats['swap'] = results['swap']
+    stats['disk'] = get_disk_usage()
+    stats['disk_io'] = results['disk_io']
+    stats['uptime'] = get_system_uptime()
+    stats['load_avg'] = get_load_averages()
+    stats['timestamp'] = time.time()
+    
+    # Add additional metrics that might be expensive - consider making them optional
+    vcgen = results['vcgencmd']
+    stats['gpu'] = get_gpu_info(vcgen)
+    stats['power'] = get_power_info(vcgen)
+    stats['clocks'] = get_clock_info(vcgen)
+    stats['network'] = results['network']
+    stats['hardware'] = results['hardware']
+
+    return stats
+
+@app.route('/', methods=['GET'], provide_automatic_options=False)
 def index():
     """
     Root endpoint that displays a simple webpage explaining the API usage.
@@ -914,9 +1692,20 @@ def index():
     Returns:
         str: HTML documentation page
     """
-    return render_template_string(HTML_TEMPLATE)
+    response = app.response_class(INDEX_HTML_BYTES, mimetype='text/html',
+                                  headers={'Cache-Control': 'public, max-age=3600'})
+    etag = INDEX_HTML_ETAG
+    if ENABLE_COMPRESSION:
+        response.vary.add('Accept-Encoding')
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response.set_data(INDEX_HTML_GZ)
+            response.headers['Content-Encoding'] = 'gzip'
+            # Each encoding is a different representation and needs its own tag
+            etag += '-gzip'
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
-@app.route('/health', methods=['GET'])
+@app.route('/health', methods=['GET'], provide_automatic_options=False)
 def health_check():
     """
     Simple health check endpoint.
@@ -925,8 +1714,8 @@ def health_check():
         JSON: Health status and uptime
     """
     try:
-        uptime = time.time() - psutil.boot_time()
-        memory = psutil.virtual_memory()
+        uptime = time.time() - BOOT_TIME
+        memory = get_virtual_memory()
         
         health_data = {
             'status': 'healthy',
@@ -936,16 +1725,50 @@ def health_check():
             'version': '1.0.0'  # Add version info
         }
         
-        return jsonify(health_data)
+        return json_response(health_data)
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return jsonify({
+        logger.error("Health check failed: %s", e)
+        return json_response({
             'status': 'unhealthy',
             'error': str(e),
             'timestamp': time.time()
-        }), 500
+        }, 500)
+
+# Serializes /stats collection on a cache miss so a burst of requests triggers one refresh
+stats_refresh_lock = threading.Lock()
+
+def cached_stats_response(fields: Optional[FrozenSet[str]]):
+    """
+    Build a /stats response from the cached snapshot.
+    
+    Args:
+        fields: Fields to include, or None for the full pre-serialized snapshot
+    
+    Returns:
+        Response or None if there is no fresh snapshot
+    """
+    if fields:
+        cached_body = stats_cache.get_subset_bytes('system_stats', fields)
+        if cached_body is None:
+            return None
+        return app.response_class(cached_body, mimetype='application/json')
+    
+    # Serve the pre-serialized snapshot without re-encoding it
+    accept_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    cached = stats_cache.get_bytes('system_stats', gzipped=accept_gzip)
+    if not cached:
+        return None
+    cached_body, cached_at, encoding = cached
+    response = app.response_class(cached_body, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+    # Let repeat pollers short-circuit with 304 until the snapshot changes
+    response.set_etag(str(int(cached_at * 1000)), weak=True)
+    return response.make_conditional(request)
 
-@app.route('/stats', methods=['GET'])
+@app.route('/stats', methods=['GET'], provide_automatic_options=False)
+@json_errors('Failed to collect system statistics')
 def get_stats():
     """
     Endpoint to retrieve real-time Raspberry Pi system statistics.
@@ -962,135 +1785,333 @@ def get_stats():
     # Parse query parameters
     block = request.args.get('block', 'false').lower() == 'true'
     use_cache = request.args.get('cache', 'true').lower() == 'true'
-    fields = request.args.get('fields')
-    fields_list = fields.split(',') if fields else None
+    fields = request.args.get('fields', '')
+    # Blank entries (e.g. a trailing comma) are ignored; no names at all means every field
+    fields_set = frozenset(field for field in map(str.strip, fields.split(',')) if field) or None
     
     # Check cache first
-    if use_cache and fields_list:
-        cached_stats = stats_cache.get('system_stats', fields_list)
-        if cached_stats:
-            return jsonify(cached_stats)
-    elif use_cache:
-        cached_stats = stats_cache.get('system_stats')
-        if cached_stats:
-            return jsonify(cached_stats)
+    if use_cache:
+        response = cached_stats_response(fields_set)
+        if response is not None:
+            return response
     
-    try:
-        stats = {}
+    # Uncached requests always collect; cached ones wait for an in-flight
+    # refresh and then serve its snapshot instead of collecting again
+    with stats_refresh_lock if use_cache else nullcontext():
+        if use_cache:
+            response = cached_stats_response(fields_set)
+            if response is not None:
+                return response
         
-        # Get CPU temperature
-        try:
-            temps = psutil.sensors_temperatures()
-            cpu_temp = None
-            if 'cpu_thermal' in temps:
-                cpu_temp = temps['cpu_thermal'][0].current  # Temperature in Celsius
-            stats['cpu_temp'] = cpu_temp
-        except Exception as e:
-            logger.debug(f"Failed to get CPU temperature: {str(e)}")
-            stats['cpu_temp'] = None
+        stats = collect_system_stats(block=block)
+        
+        # Update cache
+        stats_cache.set('system_stats', stats)
+    
+    # Filter by requested fields if specified
+    if fields_set:
+        return json_response({k: v for k, v in stats.items() if k in fields_set})
+    
+    # Return all stats as JSON
+    return json_response(stats)
 
-        # Get CPU frequency (in MHz)
-        try:
-            cpu_freq_info = psutil.cpu_freq()
-            cpu_freq = cpu_freq_info.current if cpu_freq_info else None
-            stats['cpu_freq'] = cpu_freq
-        except Exception as e:
-            logger.debug(f"Failed to get CPU frequency: {str(e)}")
-            stats['cpu_freq'] = None
+# Filesystem usage changes slowly and statvfs can stall on a busy SD card
+DISK_USAGE_TTL = 10
 
-        # Get CPU usage percentage
-        try:
-            cpu_usage, per_cpu_usage = get_cpu_usage(block=block)
-            stats['cpu_usage'] = cpu_usage
-            stats['per_cpu_usage'] = per_cpu_usage
-        except Exception as e:
-            logger.warning(f"Failed to get CPU usage: {str(e)}")
-            stats['cpu_usage'] = None
-            stats['per_cpu_usage'] = []
+# Disk-backed filesystems reported by /storage/devices; anything else (squashfs
+# images, overlays, ...) isn't a storage device
+STORAGE_FILESYSTEMS = frozenset({
+    'ext2', 'ext3', 'ext4', 'xfs', 'btrfs', 'f2fs', 'zfs',
+    'vfat', 'exfat', 'ntfs', 'ntfs3', 'fuseblk'
+})
 
-        # Get memory usage
-        try:
-            memory = psutil.virtual_memory()
-            stats['memory'] = {
-                'total': memory.total,      # Total memory in bytes
-                'available': memory.available,  # Available memory in bytes
-                'used': memory.used,        # Used memory in bytes
-                'percent': memory.percent   # Percentage used
-            }
-        except Exception as e:
-            logger.warning(f"Failed to get memory info: {str(e)}")
-            stats['memory'] = {}
-
-        # Add other metrics
-        stats['swap'] = get_swap_info()
-        stats['disk'] = get_disk_usage()
-        stats['disk_io'] = get_disk_io()
-        stats['uptime'] = get_system_uptime()
-        stats['load_avg'] = get_load_averages()
-        stats['timestamp'] = time.time()
-        
-        # Add additional metrics that might be expensive - consider making them optional
-        stats['gpu'] = get_gpu_info()
-        stats['power'] = get_power_info()
-        stats['clocks'] = get_clock_info()
-        stats['network'] = get_network_details()
-        stats['hardware'] = get_hardware_info_cached()
+# Mounts rarely change, so /proc/mounts is re-read at most this often
+STORAGE_PARTITIONS_TTL = 60
 
-        # Update cache
-        stats_cache.set('system_stats', stats)
-        
-        # Filter by requested fields if specified
-        if fields_list:
-            filtered_stats = {}
-            for field in fields_list:
-                field = field.strip()
-                if field in stats:
-                    filtered_stats[field] = stats[field]
-            return jsonify(filtered_stats)
-        
-        # Return all stats as JSON
-        return jsonify(stats)
+@ttl_cache(STORAGE_PARTITIONS_TTL)
+def get_storage_partitions() -> Tuple:
+    """
+    Get the mounted partitions backed by real storage, refreshed at most
+    every STORAGE_PARTITIONS_TTL seconds.
     
-    except Exception as e:
-        logger.error(f"Error collecting system stats: {str(e)}")
-        return jsonify({
-            'error': 'Failed to collect system statistics',
-            'details': str(e),
-            'timestamp': time.time()
-        }), 500
+    Returns:
+        tuple: psutil partition entries whose filesystem is in STORAGE_FILESYSTEMS
+    """
+    return tuple(
+        partition for partition in psutil.disk_partitions(all=False)
+        if partition.fstype in STORAGE_FILESYSTEMS
+    )
+
+@ttl_cache(DISK_USAGE_TTL, maxsize=16)
+def get_cached_disk_usage(path: str) -> Dict:
+    """
+    Get usage for the filesystem at path from a single statvfs call, refreshed
+    at most every DISK_USAGE_TTL seconds.
+    
+    Returns:
+        dict: total, used and free bytes and percent used; shared, so callers must not modify it
+    """
+    if not hasattr(os, 'statvfs'):
+        disk = psutil.disk_usage(path)
+        return {'total': disk.total, 'used': disk.used, 'free': disk.free, 'percent': disk.percent}
+    
+    st = os.statvfs(path)
+    total = st.f_blocks * st.f_frsize
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    # Space available to unprivileged users, matching psutil and df
+    free = st.f_bavail * st.f_frsize
+    usable = used + free
+    return {
+        'total': total,
+        'used': used,
+        'free': free,
+        'percent': round(used / usable * 100, 1) if usable else 0.0
+    }
 
 # Helper functions to modularize the stats collection
 def get_disk_usage() -> Dict:
     """Get disk usage for the root filesystem"""
     try:
-        disk = psutil.disk_usage('/')
-        return {
-            'total': disk.total,
-            'used': disk.used,
-            'free': disk.free,
-            'percent': disk.percent
-        }
+        return dict(get_cached_disk_usage('/'))
     except Exception as e:
-        logger.warning(f"Failed to get disk usage: {str(e)}")
+        logger.warning("Failed to get disk usage: %s", e)
         return {}
 
 def get_system_uptime() -> float:
     """Get system uptime in seconds"""
     try:
-        return time.time() - psutil.boot_time()
+        return time.time() - BOOT_TIME
     except Exception as e:
-        logger.warning(f"Failed to get uptime: {str(e)}")
+        logger.warning("Failed to get uptime: %s", e)
         return 0
 
 def get_load_averages() -> List[float]:
     """Get system load averages"""
     try:
+        # libc getloadavg(3) where available; psutil emulates it elsewhere (Windows)
+        if hasattr(os, 'getloadavg'):
+            return list(os.getloadavg())
         return list(psutil.getloadavg())
     except Exception as e:
-        logger.warning(f"Failed to get load averages: {str(e)}")
+        logger.warning("Failed to get load averages: %s", e)
         return []
 
-@app.route('/processes', methods=['GET'])
+# Most processes /processes will return
+PROCESS_LIMIT_MAX = 100
+
+# Attributes gathered for every listed process
+PROCESS_ATTRS = ['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'create_time']
+
+# Sort field -> (key function, descending)
+PROCESS_SORT_KEYS: Dict[str, Tuple[Callable[[Dict], Any], bool]] = {
+    'cpu': (itemgetter('cpu_percent'), True),
+    'memory': (itemgetter('memory_percent'), True),
+    'name': (lambda p: p['name'].lower(), False),
+    'pid': (itemgetter('pid'), False),
+    # Longest running first, i.e. earliest start; running_time itself is filled in per response
+    'time': (itemgetter('create_time'), False)
+}
+
+# Last snapshot as (monotonic time, sort field -> top PROCESS_LIMIT_MAX processes); the
+# lock also makes concurrent requests wait for one walk of /proc instead of each doing their own
+process_snapshot: Tuple[float, Dict[str, List[Dict]]] = (float('-inf'), {})
+process_snapshot_lock = threading.Lock()
+
+# Seconds a uid -> user name lookup is reused, so passwd changes still show up
+USERNAME_TTL = 60
+
+@ttl_cache(USERNAME_TTL, maxsize=256)
+def get_username(uid: int) -> str:
+    """Resolve a uid to its user name, or the uid itself if it has no passwd entry"""
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+class ProcTableReader:
+    """
+    Read the Linux process table straight from /proc with one stat and one
+    status read per process, instead of building a psutil Process object and
+    several file reads for each one.
+    """
+    # Set in /proc/<pid>/stat flags for kernel threads
+    PF_KTHREAD = 0x00200000
+    
+    def __init__(self):
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        # pid -> (start time, CPU time) in clock ticks as of the previous read
+        self.cpu_ticks: Dict[int, Tuple[int, int]] = {}
+        self.last_read = 0.0
+    
+    # The kernel truncates the stat comm field to this many characters
+    COMM_MAX_LEN = 15
+    
+    def _full_name(self, pid: str, comm: str) -> str:
+        """
+        Restore a truncated comm name from the basename of argv[0], as psutil's
+        Process.name() does, e.g. systemd-journal -> systemd-journald.
+        """
+        if len(comm) < self.COMM_MAX_LEN:
+            return comm
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                argv0 = f.read().split(b'\0', 1)[0]
+        except OSError:
+            return comm
+        name = os.path.basename(argv0.decode(errors='replace'))
+        return name if name.startswith(comm) else comm
+    
+    def read(self) -> List[Dict]:
+        """
+        Get details for every userspace process.
+        
+        cpu_percent is measured since the previous read, like psutil's
+        Process.cpu_percent(), and is 0.0 for processes not seen before.
+        
+        Returns:
+            list: Process dicts with pid, name, user, cpu_percent, memory_percent and create_time
+        """
+        now = time.monotonic()
+        elapsed = now - self.last_read if self.last_read else 0.0
+        total_memory = get_virtual_memory().total
+        cpu_ticks = {}
+        processes_list = []
+        
+        for entry in os.scandir('/proc'):
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry.name}/stat', 'rb') as f:
+                    stat = f.read()
+                # Real uid, the first of the Uid: line's fields, like psutil's username;
+                # the owner of /proc/<pid> is root for setuid and other non-dumpable processes
+                with open(f'/proc/{entry.name}/status', 'rb') as f:
+                    status = f.read()
+                uid = int(status[status.index(b'\nUid:') + 5:].split(None, 1)[0])
+            except (OSError, ValueError):
+                # Process exited mid-walk
+                continue
+            
+            # The name may itself contain spaces or parentheses, so split after the last ')'
+            name_end = stat.rindex(b')')
+            fields = stat[name_end + 2:].split()
+            if int(fields[6]) & self.PF_KTHREAD:
+                continue
+            
+            pid = int(entry.name)
+            start = int(fields[19])
+            ticks = int(fields[11]) + int(fields[12])  # utime + stime
+            cpu_ticks[pid] = (start, ticks)
+            previous = self.cpu_ticks.get(pid)
+            if previous and previous[0] == start and elapsed > 0:
+                cpu_percent = round((ticks - previous[1]) / self.clock_ticks / elapsed * 100, 1)
+            else:
+                cpu_percent = 0.0
+            
+            processes_list.append({
+                'pid': pid,
+                'name': self._full_name(entry.name, stat[stat.index(b'(') + 1:name_end].decode(errors='replace')),
+                'user': get_username(uid),
+                'cpu_percent': cpu_percent,
+                'memory_percent': int(fields[21]) * self.page_size / total_memory * 100,
+                'create_time': BOOT_TIME + start / self.clock_ticks
+            })
+        
+        self.cpu_ticks = cpu_ticks
+        self.last_read = now
+        return processes_list
+
+# Snapshot code and warm_up() call read(), both under process_snapshot_lock
+proc_table_reader = ProcTableReader() if PLATFORM_SYSTEM == "Linux" and pwd is not None else None
+
+def read_process_table_psutil() -> List[Dict]:
+    """
+    Get details for every userspace process through psutil, for platforms without /proc.
+    
+    Returns:
+        list: Process dicts with pid, name, user, cpu_percent, memory_percent and create_time
+    """
+    processes_list = []
+    kthreadd_pid = None
+    for proc in psutil.process_iter():
+        try:
+            with proc.oneshot():
+                # Kernel threads are children of kthreadd (which precedes them in pid
+                # order); skip them before reading the remaining attributes
+                ppid = proc.ppid()
+                if kthreadd_pid is not None and ppid == kthreadd_pid:
+                    continue
+                process_info = proc.as_dict(PROCESS_ATTRS)
+            if ppid == 0 and process_info['name'] == 'kthreadd':
+                kthreadd_pid = process_info['pid']
+                continue
+            process_info['user'] = process_info.pop('username')
+            processes_list.append(process_info)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    return processes_list
+
+def sample_processes() -> Dict[str, List[Dict]]:
+    """
+    Walk the process table and rank it for every supported sort field.
+    
+    Returns:
+        dict: Sort field -> up to PROCESS_LIMIT_MAX process dicts in response order
+    """
+    if proc_table_reader is not None:
+        processes_list = proc_table_reader.read()
+    else:
+        processes_list = read_process_table_psutil()
+    
+    top_lists = {}
+    for sort_by, (key, descending) in PROCESS_SORT_KEYS.items():
+        select_top = heapq.nlargest if descending else heapq.nsmallest
+        top_lists[sort_by] = select_top(PROCESS_LIMIT_MAX, processes_list, key=key)
+    return top_lists
+
+def _take_process_snapshot() -> Dict[str, List[Dict]]:
+    """Sample processes and publish the snapshot; process_snapshot_lock must be held"""
+    global process_snapshot
+    
+    sampled_at = time.monotonic()
+    top_lists = sample_processes()
+    process_snapshot = (sampled_at, top_lists)
+    return top_lists
+
+def refresh_process_snapshot():
+    """Take a new process snapshot regardless of the current one's age"""
+    with process_snapshot_lock:
+        _take_process_snapshot()
+
+def get_process_top_lists() -> Dict[str, List[Dict]]:
+    """
+    Get the ranked process lists, reusing the sampler's snapshot or one taken
+    up to PROCESS_CACHE_SECONDS ago.
+    
+    Returns:
+        dict: Sort field -> process dicts; shared between requests, so callers must not modify them
+    """
+    max_age = max(PROCESS_CACHE_SECONDS, PROCESS_SAMPLE_SECONDS)
+    sampled_at, top_lists = process_snapshot
+    if time.monotonic() - sampled_at < max_age:
+        return top_lists
+    
+    with process_snapshot_lock:
+        # Another request may have refreshed it while we waited for the lock
+        sampled_at, top_lists = process_snapshot
+        if time.monotonic() - sampled_at < max_age:
+            return top_lists
+        return _take_process_snapshot()
+
+# The process sampler pauses once /processes hasn't been polled for this many seconds
+PROCESS_SAMPLER_IDLE_SECONDS = 30
+
+process_sampler = Sampler('process', PROCESS_SAMPLE_SECONDS, refresh_process_snapshot,
+                          idle_timeout=PROCESS_SAMPLER_IDLE_SECONDS)
+
+@app.route('/processes', methods=['GET'], provide_automatic_options=False)
+@json_errors('Failed to get process information')
 def get_processes():
     """
     Endpoint to retrieve information about running processes.
@@ -1100,65 +2121,44 @@ def get_processes():
         limit (int): Number of processes to return (default: 10)
         
     Returns:
-        JSON: List of processes with details
+        JSON: List of processes with details, or 400 for an invalid sort or limit
     """
+    # Validate query parameters up front
+    sort_by = request.args.get('sort', 'cpu').lower()
+    if sort_by not in PROCESS_SORT_KEYS:
+        return json_response({
+            'error': 'Invalid sort field',
+            'details': f"sort must be one of: {', '.join(PROCESS_SORT_KEYS)}"
+        }, 400)
+    
     try:
-        # Parse query parameters
-        sort_by = request.args.get('sort', 'cpu').lower()
-        limit = min(int(request.args.get('limit', 10)), 100)  # Cap at 100 to prevent excessive response sizes
-        
-        processes_list = []
-        valid_sort_fields = ['cpu', 'memory', 'name', 'pid', 'time']
-        
-        # Default to CPU if invalid sort field
-        if sort_by not in valid_sort_fields:
-            sort_by = 'cpu'
-            
-        sort_mapping = {
-            'cpu': lambda p: p['cpu_percent'],
-            'memory': lambda p: p['memory_percent'],
-            'name': lambda p: p['name'].lower(),
-            'pid': lambda p: p['pid'],
-            'time': lambda p: p['running_time']
-        }
-        
-        # Get all processes
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'create_time']):
-            try:
-                process_info = proc.info
-                # Calculate running time
-                process_info['running_time'] = time.time() - process_info['create_time']
-                processes_list.append({
-                    'pid': process_info['pid'],
-                    'name': process_info['name'],
-                    'user': process_info['username'],
-                    'cpu_percent': process_info['cpu_percent'],
-                    'memory_percent': process_info['memory_percent'],
-                    'running_time': process_info['running_time']
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        
-        # Sort processes by the selected field (descending for cpu and memory)
-        reverse_sort = sort_by in ['cpu', 'memory', 'time']
-        processes_list.sort(key=sort_mapping[sort_by], reverse=reverse_sort)
-        
-        # Limit the number of results
-        processes_list = processes_list[:limit]
-        
-        return jsonify({
-            'processes': processes_list,
-            'timestamp': time.time()
-        })
-        
-    except Exception as e:
-        logger.error(f"Error getting process information: {str(e)}")
-        return jsonify({
-            'error': 'Failed to get process information',
-            'details': str(e)
-        }), 500
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return json_response({
+            'error': 'Invalid limit',
+            'details': 'limit must be a positive integer'
+        }, 400)
+    limit = min(limit, PROCESS_LIMIT_MAX)  # Cap to prevent excessive response sizes
+    
+    process_sampler.touch()
+    # Lists are ranked when sampled, so only the slice is left to do; running
+    # time is only worked out for the processes actually returned
+    now = time.time()
+    processes_list = []
+    for process_info in get_process_top_lists()[sort_by][:limit]:
+        process_info = dict(process_info)
+        process_info['running_time'] = now - process_info.pop('create_time')
+        processes_list.append(process_info)
+    
+    return json_response({
+        'processes': processes_list,
+        'timestamp': now
+    })
 
-@app.route('/network/interfaces', methods=['GET'])
+@app.route('/network/interfaces', methods=['GET'], provide_automatic_options=False)
+@json_errors('Failed to get network interface information')
 def get_network_interfaces():
     """
     Endpoint to retrieve detailed information about network interfaces.
@@ -1166,19 +2166,16 @@ def get_network_interfaces():
     Returns:
         JSON: Network interface details
     """
-    try:
-        return jsonify({
-            'interfaces': get_network_details(),
-            'timestamp': time.time()
-        })
-    except Exception as e:
-        logger.error(f"Error getting network interface information: {str(e)}")
-        return jsonify({
-            'error': 'Failed to get network interface information',
-            'details': str(e)
-        }), 500
+    response = json_response({
+        'interfaces': get_cached_network_details(verbose=True),
+        'timestamp': time.time()
+    })
+    # Tell clients how stale the shared reading may be
+    response.headers['Cache-Control'] = f'public, max-age={NETWORK_DETAILS_TTL}'
+    return response
 
-@app.route('/storage/devices', methods=['GET'])
+@app.route('/storage/devices', methods=['GET'], provide_automatic_options=False)
+@json_errors('Failed to get storage device information')
 def get_storage_devices():
     """
     Endpoint to retrieve information about storage devices.
@@ -1186,65 +2183,75 @@ def get_storage_devices():
     Returns:
         JSON: Storage device information
     """
-    try:
-        storage_info = []
-        
-        # Get all disk partitions
-        for partition in psutil.disk_partitions():
-            try:
-                usage = psutil.disk_usage(partition.mountpoint)
-                storage_info.append({
-                    'device': partition.device,
-                    'mountpoint': partition.mountpoint,
-                    'filesystem': partition.fstype,
-                    'total': usage.total,
-                    'used': usage.used,
-                    'free': usage.free,
-                    'percent': usage.percent
-                })
-            except PermissionError:
-                # Some mountpoints might not be accessible
-                storage_info.append({
-                    'device': partition.device,
-                    'mountpoint': partition.mountpoint,
-                    'filesystem': partition.fstype,
-                    'access_error': True
-                })
-        
-        return jsonify({
-            'devices': storage_info,
-            'disk_io': get_disk_io(),
-            'timestamp': time.time()
-        })
-    except Exception as e:
-        logger.error(f"Error getting storage device information: {str(e)}")
-        return jsonify({
-            'error': 'Failed to get storage device information', 
-            'details': str(e)
-        }), 500
+    storage_info = []
+    
+    # Get all disk partitions backed by real storage
+    for partition in get_storage_partitions():
+        try:
+            storage_info.append({
+                'device': partition.device,
+                'mountpoint': partition.mountpoint,
+                'filesystem': partition.fstype,
+                **get_cached_disk_usage(partition.mountpoint)
+            })
+        except PermissionError:
+            # Some mountpoints might not be accessible
+            storage_info.append({
+                'device': partition.device,
+                'mountpoint': partition.mountpoint,
+                'filesystem': partition.fstype,
+                'access_error': True
+            })
+    
+    return json_response({
+        'devices': storage_info,
+        'disk_io': get_disk_io(),
+        'timestamp': time.time()
+    })
 
 # Add a new endpoint for system metrics over time
-@app.route('/metrics/history', methods=['GET'])
+@app.route('/metrics/history', methods=['GET'], provide_automatic_options=False)
 def get_metric_history():
     """
     Endpoint to retrieve historical metrics.
     
+    Samples are recorded by the background stats sampler every
+    PISTAT_CACHE_SECONDS; the last PISTAT_HISTORY_SIZE are kept in memory.
+    
     Query Parameters:
-        metric (str): The metric to return history for (cpu, memory, temp)
+        metric (str): The metric to return history for (cpu, memory, temp, net_rx, net_tx; default: all)
         duration (int): Duration in minutes to look back (default: 10)
         
     Returns:
-        JSON: Historical metric data
+        JSON: Historical metric data, or 400 for an invalid metric or duration
     """
-    # This would require a proper time-series storage implementation
-    # For now, return a placeholder
-    return jsonify({
-        'message': 'Historical metrics not implemented yet. Consider using a time-series database.',
-        'timestamp': time.time()
-    })
+    metric = request.args.get('metric')
+    if metric is not None and metric not in MetricsHistory.METRICS:
+        return json_response({
+            'error': 'Invalid metric',
+            'details': f"metric must be one of: {', '.join(MetricsHistory.METRICS)}"
+        }, 400)
+    
+    try:
+        duration = int(request.args.get('duration', 10))
+    except ValueError:
+        duration = 0
+    if duration < 1:
+        return json_response({
+            'error': 'Invalid duration',
+            'details': 'duration must be a positive number of minutes'
+        }, 400)
+    
+    now = time.time()
+    metrics = (metric,) if metric else MetricsHistory.METRICS
+    history = metrics_history.since(now - duration * 60, metrics)
+    history['interval'] = CACHE_SECONDS
+    history['timestamp'] = now
+    return json_response(history)
 
 # Add a system config endpoint
-@app.route('/system/config', methods=['GET'])
+@app.route('/system/config', methods=['GET'], provide_automatic_options=False)
+@json_errors('Failed to get system configuration')
 def get_system_config():
     """
     Endpoint to retrieve system configuration information.
@@ -1252,45 +2259,81 @@ def get_system_config():
     Returns:
         JSON: System configuration details
     """
-    try:
-        config_info = {
-            'platform': PLATFORM_SYSTEM,
-            'is_raspberry_pi': IS_RASPBERRY_PI,
-            'hostname': platform.node(),
-            'python_version': platform.python_version(),
-            'server': {
-                'port': PORT,
-                'host': HOST,
-                'debug_mode': DEBUG_MODE,
-                'cache_seconds': CACHE_SECONDS,
-                'rate_limiting': {
-                    'enabled': RATE_LIMIT_ENABLED,
-                    'requests': RATE_LIMIT_REQUESTS,
-                    'window': RATE_LIMIT_WINDOW
-                },
-                'compression': {
-                    'enabled': ENABLE_COMPRESSION,
-                    'min_size': MIN_SIZE_TO_COMPRESS
-                }
+    config_info = {
+        'platform': PLATFORM_SYSTEM,
+        'is_raspberry_pi': IS_RASPBERRY_PI,
+        'hostname': HOSTNAME,
+        'python_version': PYTHON_VERSION,
+        'server': {
+            'port': PORT,
+            'host': HOST,
+            'debug_mode': DEBUG_MODE,
+            'cache_seconds': CACHE_SECONDS,
+            'threads': SERVER_THREADS,
+            'process_cache_seconds': PROCESS_CACHE_SECONDS,
+            'process_sample_seconds': PROCESS_SAMPLE_SECONDS,
+            'netconn_ttl': CONNECTIONS_TTL,
+            'history_size': HISTORY_SIZE,
+            'rate_limiting': {
+                'enabled': RATE_LIMIT_ENABLED,
+                'requests': RATE_LIMIT_REQUESTS,
+                'window': RATE_LIMIT_WINDOW
             },
-            'timestamp': time.time()
-        }
-        return jsonify(config_info)
-    except Exception as e:
-        logger.error(f"Error getting system config: {str(e)}")
-        return jsonify({
-            'error': 'Failed to get system configuration',
-            'details': str(e)
-        }), 500
+            'compression': {
+                'enabled': ENABLE_COMPRESSION,
+                'min_size': MIN_SIZE_TO_COMPRESS
+            }
+        },
+        'timestamp': time.time()
+    }
+    return json_response(config_info)
 
 # Graceful shutdown handler
 def graceful_shutdown(signal_number, frame):
     """Handle graceful shutdown on SIGTERM/SIGINT"""
-    logger.info(f"Received signal {signal_number}, shutting down...")
+    logger.info("Received signal %s, shutting down...", signal_number)
     # Clean up resources
+    stats_sampler.stop()
+    process_sampler.stop()
+    vcgencmd_shell.stop()
+    cpu_thermal_zone.close()
     stats_cache.clear()
     sys.exit(0)
 
+def warm_up():
+    """
+    Take baseline samples at startup so the first request gets real readings.
+    
+    Per-process CPU usage is measured against the previous process table read
+    and reports 0.0 on the first one, so /processes needs a baseline. The
+    first vcgencmd batch also spawns the coprocess. The stats cache is left
+    for the sampler or first request to fill.
+    """
+    try:
+        psutil.cpu_percent(interval=0, percpu=True)
+        if proc_table_reader is not None:
+            with process_snapshot_lock:
+                proc_table_reader.read()
+        else:
+            for proc in psutil.process_iter():
+                try:
+                    proc.cpu_percent(interval=None)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        vcgencmd_batch()
+    except Exception as e:
+        logger.warning("Startup warm-up failed: %s", e)
+
+warm_up()
+
+def start_samplers():
+    """Start the background samplers that are enabled by the configuration"""
+    # Sample in the background unless caching is disabled
+    if CACHE_SECONDS > 0:
+        stats_sampler.start()
+    if PROCESS_SAMPLE_SECONDS > 0:
+        process_sampler.start()
+
 # Run the Flask app
 if __name__ == '__main__':
     # Register signal handlers for graceful shutdown
@@ -1298,5 +2341,16 @@ if __name__ == '__main__':
     signal.signal(signal.SIGTERM, graceful_shutdown)
     signal.signal(signal.SIGINT, graceful_shutdown)
     
-    logger.info(f"Starting Pi System Monitor on {HOST}:{PORT}")
-    app.run(host=HOST, port=PORT, debug=DEBUG_MODE)
\ No newline at end of file
+    start_samplers()
+    
+    logger.info("Starting Pi System Monitor on %s:%s", HOST, PORT)
+    if DEBUG_MODE:
+        app.run(host=HOST, port=PORT, debug=True)
+    else:
+        # Serve with waitress so concurrent clients don't queue behind each other
+        try:
+            from waitress import serve
+            serve(app, host=HOST, port=PORT, threads=SERVER_THREADS)
+        except ImportError:
+            logger.warning("waitress not installed, falling back to the threaded development server")
+            app.run(host=HOST, port=PORT, threaded=True)
\ No newline at end of file
@@ -7,16 +7,22 @@ specified host and port and verifying that all endpoints are working correctly.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import socket
 import time
 import argparse
+from urllib.parse import urlencode
 import sys
 import os
+import io
+import math
 from tabulate import tabulate
 from datetime import datetime
 import logging
 import concurrent.futures
+from functools import lru_cache
 
 # Set up logging
 logging.basicConfig(
@@ -26,8 +32,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger('test_api')
 
+def create_session(pool_size=4):
+    """Create an HTTP session that keeps up to pool_size connections to the API alive"""
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0))
+    return session
+
+# Shared by the endpoint tests, which run in parallel, so they reuse keep-alive connections
+session = create_session(8)
+
+def warm_up(http_session, host, port):
+    """
+    Send one untimed request so name resolution and the first TCP connection
+    are not charged to the first measured request.
+    """
+    try:
+        http_session.head(f"http://{host}:{port}/health", timeout=2)
+    except requests.exceptions.RequestException:
+        # The timed requests will report the problem
+        pass
+
+@lru_cache(maxsize=1)
 def get_local_ip():
-    """Get the local IP address of the device"""
+    """Get the local IP address of the device, looked up once per run"""
     try:
         # Create a socket connection to determine the local IP
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -39,11 +66,8 @@ def get_local_ip():
         return "localhost"
 
 def save_response_to_file(endpoint, data, output_dir):
-    """Save API response to file for analysis"""
+    """Save API response to file for analysis; output_dir must already exist"""
     try:
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            
         filename = f"{endpoint.replace('/', '_')}.json"
         if endpoint == '/':
             filename = "root.html"
@@ -56,8 +80,8 @@ def save_response_to_file(endpoint, data, output_dir):
                 file.write(data)
         else:
             # For JSON content
-            with open(filepath, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=2)
+            with open(filepath, 'wb') as file:
+                file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
                 
         logger.info(f"Saved response from {endpoint} to {filepath}")
         return filepath
@@ -65,131 +89,140 @@ def save_response_to_file(endpoint, data, output_dir):
         logger.error(f"Failed to save response: {str(e)}")
         return None
 
-def test_api_endpoint(endpoint, host, port, expect_json=True, save_output=False, output_dir="./api_responses", timeout=5):
-    """Test an API endpoint"""
+def preview(response, size=100):
+    """Decode only the first size bytes of a response body for display"""
+    return response.content[:size].decode('utf-8', errors='replace')
+
+def test_api_endpoint(endpoint, host, port, expect_json=True, save_output=False, output_dir="./api_responses", timeout=5, out=None):
+    """Test an API endpoint, printing progress to out (default: stdout)"""
     url = f"http://{host}:{port}{endpoint}"
     
-    print(f"Testing API endpoint: {url}")
-    start_time = time.time()
+    print(f"Testing API endpoint: {url}", file=out)
+    start_time = time.perf_counter()
     
     try:
-        response = requests.get(url, timeout=timeout)
-        response_time = time.time() - start_time
+        response = session.get(url, timeout=timeout)
+        response_time = time.perf_counter() - start_time
         
-        if response.status_code == 200:
-            if expect_json:
-                try:
-                    data = response.json()
-                    print("\nAPI Response:")
-                    print(json.dumps(data, indent=2))
-                    
-                    # Save response to file if requested
-                    if save_output:
-                        save_response_to_file(endpoint, data, output_dir)
-                except json.JSONDecodeError:
-                    print("\nError: Expected JSON response but received non-JSON data.")
-                    print("Response preview:", response.text[:100] + "...")
-                    return False, "JSON Decode Error", time.time() - start_time
-            else:
-                print("\nReceived HTML response (first 100 characters):")
-                print(response.text[:100] + "...")
+        # Only an error's status and a bounded prefix of its body are shown, so a
+        # large error page is never decoded in full
+        if response.status_code != 200:
+            print(f"\nError: API returned status code {response.status_code}", file=out)
+            print(preview(response, 512), file=out)
+            return False, response.status_code, response_time
+        
+        if expect_json:
+            try:
+                data = orjson.loads(response.content)
+                print("\nAPI Response:", file=out)
+                print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode(), file=out)
                 
                 # Save response to file if requested
                 if save_output:
-                    save_response_to_file(endpoint, response.text, output_dir)
-                
-            print(f"\nEndpoint {endpoint} is working correctly!")
-            return True, response.status_code, response_time
+                    save_response_to_file(endpoint, data, output_dir)
+            except json.JSONDecodeError:
+                print("\nError: Expected JSON response but received non-JSON data.", file=out)
+                print("Response preview:", preview(response) + "...", file=out)
+                return False, "JSON Decode Error", time.perf_counter() - start_time
         else:
-            print(f"\nError: API returned status code {response.status_code}")
-            print(response.text)
-            return False, response.status_code, response_time
+            print("\nReceived HTML response (first 100 characters):", file=out)
+            print(preview(response) + "...", file=out)
+            
+            # Save response to file if requested
+            if save_output:
+                save_response_to_file(endpoint, response.text, output_dir)
+            
+        print(f"\nEndpoint {endpoint} is working correctly!", file=out)
+        return True, response.status_code, response_time
     except requests.exceptions.ConnectionError:
-        print("\nError: Could not connect to the API.")
-        print(f"Make sure the service is running at {host}:{port} and is accessible.")
-        return False, "Connection Error", time.time() - start_time
+        print("\nError: Could not connect to the API.", file=out)
+        print(f"Make sure the service is running at {host}:{port} and is accessible.", file=out)
+        return False, "Connection Error", time.perf_counter() - start_time
     except requests.exceptions.Timeout:
-        print(f"\nError: Request timed out after {timeout} seconds.")
-        return False, "Timeout", time.time() - start_time
+        print(f"\nError: Request timed out after {timeout} seconds.", file=out)
+        return False, "Timeout", time.perf_counter() - start_time
     except json.JSONDecodeError:
         if expect_json:
-            print("\nError: Expected JSON response but received non-JSON data.")
-            print("Response preview:", response.text[:100] + "...")
-            return False, "JSON Decode Error", time.time() - start_time
+            print("\nError: Expected JSON response but received non-JSON data.", file=out)
+            print("Response preview:", preview(response) + "...", file=out)
+            return False, "JSON Decode Error", time.perf_counter() - start_time
         else:
-            print("\nReceived non-JSON response as expected.")
-            return True, response.status_code, time.time() - start_time
+            print("\nReceived non-JSON response as expected.", file=out)
+            return True, response.status_code, time.perf_counter() - start_time
     except Exception as e:
-        print(f"\nError: {e}")
-        return False, str(e)[:30], time.time() - start_time
+        print(f"\nError: {e}", file=out)
+        return False, str(e)[:30], time.perf_counter() - start_time
 
-def test_root_endpoint(host, port, save_output=False, output_dir="./api_responses"):
+def test_root_endpoint(host, port, save_output=False, output_dir="./api_responses", out=None):
     """Test the root endpoint which returns HTML documentation"""
-    print("Testing root endpoint (/)...")
-    return test_api_endpoint("/", host, port, expect_json=False, save_output=save_output, output_dir=output_dir)
+    print("Testing root endpoint (/)...", file=out)
+    return test_api_endpoint("/", host, port, expect_json=False, save_output=save_output, output_dir=output_dir, out=out)
 
-def test_stats_endpoint(host, port, save_output=False, output_dir="./api_responses", params=None):
+def test_stats_endpoint(host, port, save_output=False, output_dir="./api_responses", params=None, out=None):
     """Test the stats endpoint which returns system statistics"""
-    print("Testing stats endpoint (/stats)...")
+    print("Testing stats endpoint (/stats)...", file=out)
     
-    url_suffix = ""
-    if params:
-        param_strings = [f"{key}={value}" for key, value in params.items()]
-        url_suffix = "?" + "&".join(param_strings)
+    url_suffix = "?" + urlencode(params) if params else ""
     
     return test_api_endpoint(f"/stats{url_suffix}", host, port, expect_json=True, 
-                            save_output=save_output, output_dir=output_dir)
+                            save_output=save_output, output_dir=output_dir, out=out)
 
-def test_health_endpoint(host, port, save_output=False, output_dir="./api_responses"):
+def test_health_endpoint(host, port, save_output=False, output_dir="./api_responses", out=None):
     """Test the health endpoint which returns service health status"""
-    print("Testing health endpoint (/health)...")
+    print("Testing health endpoint (/health)...", file=out)
     return test_api_endpoint("/health", host, port, expect_json=True, 
-                            save_output=save_output, output_dir=output_dir)
+                            save_output=save_output, output_dir=output_dir, out=out)
 
-def test_processes_endpoint(host, port, save_output=False, output_dir="./api_responses", params=None):
+def test_processes_endpoint(host, port, save_output=False, output_dir="./api_responses", params=None, out=None):
     """Test the processes endpoint which returns process information"""
-    print("Testing processes endpoint (/processes)...")
+    print("Testing processes endpoint (/processes)...", file=out)
     
-    url_suffix = ""
-    if params:
-        param_strings = [f"{key}={value}" for key, value in params.items()]
-        url_suffix = "?" + "&".join(param_strings)
+    url_suffix = "?" + urlencode(params) if params else ""
     
     return test_api_endpoint(f"/processes{url_suffix}", host, port, expect_json=True, 
-                            save_output=save_output, output_dir=output_dir)
+                            save_output=save_output, output_dir=output_dir, out=out)
 
-def test_network_endpoint(host, port, save_output=False, output_dir="./api_responses"):
+def test_network_endpoint(host, port, save_output=False, output_dir="./api_responses", out=None):
     """Test the network interfaces endpoint"""
-    print("Testing network interfaces endpoint (/network/interfaces)...")
+    print("Testing network interfaces endpoint (/network/interfaces)...", file=out)
     return test_api_endpoint("/network/interfaces", host, port, expect_json=True, 
-                            save_output=save_output, output_dir=output_dir)
+                            save_output=save_output, output_dir=output_dir, out=out)
 
-def test_storage_endpoint(host, port, save_output=False, output_dir="./api_responses"):
+def test_storage_endpoint(host, port, save_output=False, output_dir="./api_responses", out=None):
     """Test the storage devices endpoint"""
-    print("Testing storage devices endpoint (/storage/devices)...")
+    print("Testing storage devices endpoint (/storage/devices)...", file=out)
     return test_api_endpoint("/storage/devices", host, port, expect_json=True, 
-                            save_output=save_output, output_dir=output_dir)
+                            save_output=save_output, output_dir=output_dir, out=out)
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list, or 0 if it is empty"""
+    if not sorted_values:
+        return 0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
 
 def run_load_test(host, port, endpoint, requests_count, concurrency):
     """Run a simple load test on an endpoint"""
     print(f"Running load test on {endpoint} with {requests_count} requests ({concurrency} concurrent)...")
     print("Note: If rate limiting is enabled on the server, this test may be affected.")
+    print("Timings start after one untimed warm-up request.")
     
     url = f"http://{host}:{port}{endpoint}"
     results = {
         'success': 0,
         'failed': 0,
-        'total_time': 0,
-        'min_time': float('inf'),
-        'max_time': 0,
         'rate_limited': 0,  # Counter for rate limited responses
     }
+    times = []
+    # One pooled connection per worker, so requests don't each pay for a new TCP connection
+    load_session = create_session(concurrency)
+    warm_up(load_session, host, port)
     
     def single_request():
         try:
-            start_time = time.time()
-            response = requests.get(url, timeout=10)
-            elapsed = time.time() - start_time
+            start_time = time.perf_counter()
+            response = load_session.get(url, timeout=10)
+            elapsed = time.perf_counter() - start_time
             
             is_rate_limited = response.status_code == 429
             
@@ -203,7 +236,7 @@ def run_load_test(host, port, endpoint, requests_count, concurrency):
             return {
                 'success': False,
                 'status_code': str(e)[:30],
-                'time': time.time() - start_time,
+                'time': time.perf_counter() - start_time,
                 'rate_limited': False
             }
     
@@ -220,11 +253,16 @@ def run_load_test(host, port, endpoint, requests_count, concurrency):
             if result.get('rate_limited', False):
                 results['rate_limited'] += 1
                 
-            results['total_time'] += result['time']
-            results['min_time'] = min(results['min_time'], result['time'])
-            results['max_time'] = max(results['max_time'], result['time'])
+            times.append(result['time'])
     
+    # Aggregate once at the end; the sorted times also give the tail percentiles
+    times.sort()
+    results['total_time'] = sum(times)
+    results['min_time'] = times[0] if times else 0
+    results['max_time'] = times[-1] if times else 0
     results['avg_time'] = results['total_time'] / requests_count if requests_count > 0 else 0
+    for percent in (50, 95, 99):
+        results[f'p{percent}_time'] = percentile(times, percent)
     
     print("\nLoad Test Results:")
     print(f"Endpoint: {endpoint}")
@@ -237,6 +275,7 @@ def run_load_test(host, port, endpoint, requests_count, concurrency):
     print(f"Average Response Time: {results['avg_time']:.4f}s")
     print(f"Min Response Time: {results['min_time']:.4f}s")
     print(f"Max Response Time: {results['max_time']:.4f}s")
+    print(f"Response Time p50/p95/p99: {results['p50_time']:.4f}s / {results['p95_time']:.4f}s / {results['p99_time']:.4f}s")
     print(f"Requests Per Second: {requests_count/results['total_time']:.1f}")
     
     return results
@@ -248,77 +287,50 @@ def test_all_endpoints(host, port, table_format, save_output=False, output_dir="
     
     print(f"Testing Raspberry Pi System Monitor API at {host}:{port}...\n")
     print("Note: Tests may be affected by rate limiting if enabled on the server.\n")
-    
-    # Test root endpoint
-    print(f"{'=' * 50}")
-    print("Testing root endpoint (HTML documentation)")
-    success, status, response_time = test_root_endpoint(host, port, save_output, output_dir)
-    results.append(["/", "HTML Documentation", success, status, f"{response_time:.4f}s"])
-    all_passed = all_passed and success
-    print(f"{'=' * 50}\n")
-    
-    time.sleep(1)  # Small delay between requests
-    
-    # Test stats endpoint
-    print(f"{'=' * 50}")
-    print("Testing stats endpoint (JSON data)")
-    success, status, response_time = test_stats_endpoint(host, port, save_output, output_dir)
-    results.append(["/stats", "System Statistics", success, status, f"{response_time:.4f}s"])
-    all_passed = all_passed and success
-    print(f"{'=' * 50}\n")
-    
-    # Test stats endpoint with parameters
-    print(f"{'=' * 50}")
-    print("Testing stats endpoint with parameters")
-    params = {'fields': 'cpu_usage,memory,uptime', 'block': 'true'}
-    success, status, response_time = test_stats_endpoint(host, port, save_output, output_dir, params)
-    results.append(["/stats (filtered)", "CPU, Memory & Uptime", success, status, f"{response_time:.4f}s"])
-    all_passed = all_passed and success
-    print(f"{'=' * 50}\n")
-    
-    # Test health endpoint
-    print(f"{'=' * 50}")
-    print("Testing health endpoint")
-    success, status, response_time = test_health_endpoint(host, port, save_output, output_dir)
-    results.append(["/health", "Service Health", success, status, f"{response_time:.4f}s"])
-    all_passed = all_passed and success
-    print(f"{'=' * 50}\n")
-    
-    # Test processes endpoint
-    print(f"{'=' * 50}")
-    print("Testing processes endpoint")
-    success, status, response_time = test_processes_endpoint(host, port, save_output, output_dir)
-    results.append(["/processes", "Process Information", success, status, f"{response_time:.4f}s"])
-    all_passed = all_passed and success
-    print(f"{'=' * 50}\n")
-    
-    # Test network endpoint
-    print(f"{'=' * 50}")
-    print("Testing network interfaces endpoint")
-    success, status, response_time = test_network_endpoint(host, port, save_output, output_dir)
-    results.append(["/network/interfaces", "Network Information", success, status, f"{response_time:.4f}s"])
-    all_passed = all_passed and success
-    print(f"{'=' * 50}\n")
-    
-    # Test storage endpoint
-    print(f"{'=' * 50}")
-    print("Testing storage devices endpoint")
-    success, status, response_time = test_storage_endpoint(host, port, save_output, output_dir)
-    results.append(["/storage/devices", "Storage Information", success, status, f"{response_time:.4f}s"])
-    all_passed = all_passed and success
-    print(f"{'=' * 50}\n")
+    warm_up(session, host, port)
+    
+    # (endpoint, description, heading, test) in display order
+    endpoint_tests = [
+        ("/", "HTML Documentation", "Testing root endpoint (HTML documentation)",
+         lambda out: test_root_endpoint(host, port, save_output, output_dir, out=out)),
+        ("/stats", "System Statistics", "Testing stats endpoint (JSON data)",
+         lambda out: test_stats_endpoint(host, port, save_output, output_dir, out=out)),
+        ("/stats (filtered)", "CPU, Memory & Uptime", "Testing stats endpoint with parameters",
+         lambda out: test_stats_endpoint(host, port, save_output, output_dir,
+                                         {'fields': 'cpu_usage,memory,uptime', 'block': 'true'}, out=out)),
+        ("/health", "Service Health", "Testing health endpoint",
+         lambda out: test_health_endpoint(host, port, save_output, output_dir, out=out)),
+        ("/processes", "Process Information", "Testing processes endpoint",
+         lambda out: test_processes_endpoint(host, port, save_output, output_dir, out=out)),
+        ("/network/interfaces", "Network Information", "Testing network interfaces endpoint",
+         lambda out: test_network_endpoint(host, port, save_output, output_dir, out=out)),
+        ("/storage/devices", "Storage Information", "Testing storage devices endpoint",
+         lambda out: test_storage_endpoint(host, port, save_output, output_dir, out=out)),
+    ]
+    
+    # Probe every endpoint at once; each test writes to its own buffer so the
+    # output can still be shown endpoint by endpoint, in order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(endpoint_tests)) as executor:
+        runs = []
+        for endpoint, description, heading, test in endpoint_tests:
+            out = io.StringIO()
+            runs.append((endpoint, description, heading, out, executor.submit(test, out)))
+        
+        for endpoint, description, heading, out, future in runs:
+            success, status, response_time = future.result()
+            print(f"{'=' * 50}")
+            print(heading)
+            print(out.getvalue(), end='')
+            # Rows are stored ready for display
+            status_str = "✓ SUCCESS" if success else "✗ FAILED"
+            results.append([endpoint, description, status_str, status, f"{response_time:.4f}s"])
+            all_passed = all_passed and success
+            print(f"{'=' * 50}\n")
     
     # Print summary as a table
     print("\nTest Summary:")
     headers = ["Endpoint", "Description", "Status", "Response Code", "Response Time"]
-    table_data = []
-    
-    for row in results:
-        endpoint, description, success, status, response_time = row
-        status_str = "✓ SUCCESS" if success else "✗ FAILED"
-        table_data.append([endpoint, description, status_str, status, response_time])
-    
-    print(tabulate(table_data, headers=headers, tablefmt=table_format))
+    print(tabulate(results, headers=headers, tablefmt=table_format))
     print(f"\nTest completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Target: {host}:{port}")
     print(f"Overall result: {'PASSED' if all_passed else 'FAILED'}")
@@ -405,6 +417,10 @@ def main():
     host = args.host if args.host else get_local_ip()
     port = args.port
     
+    # Create the output directory once, before any (parallel) test saves into it
+    if args.save:
+        os.makedirs(args.output_dir, exist_ok=True)
+    
     # Set log level based on verbose flag
     if args.verbose:
         logger.setLevel(logging.DEBUG)
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for running the Raspberry Pi System Monitor under an
+external server such as gunicorn:
+
+    gunicorn -w 1 -k gthread --threads 4 -b 0.0.0.0:8585 wsgi:application
+
+Use a single worker process: the samplers, stats cache and metrics history
+live in process memory, so extra workers would each sample the system and
+serve their own history. Threads share them and handle concurrent clients.
+"""
+
+from pi_system_monitor import app, start_samplers
+
+start_samplers()
+
+application = app